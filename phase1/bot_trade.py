@@ -78,3 +78,52 @@ def make_decision(epoch: int, price: float):
         'Asset A': allocation,
         'Cash': 1.0 - allocation
     }
+
+
+def fill_prices(prices):
+    # Même sécurisation que make_decision: un prix manquant reprend le précédent (100.0 au départ)
+    prices = np.asarray(prices, dtype=float)
+    valid = ~np.isnan(prices)
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(prices)), -1))
+    return np.where(last_valid >= 0, prices[np.maximum(last_valid, 0)], 100.0)
+
+def make_decisions(prices):
+    """
+    Version vectorisée de make_decision sur toute la série d'un coup.
+    prices: tableau (T, 1) des prix de 'Asset A'
+    Renvoie les poids (T, 2) dans l'ordre ['Asset A', 'Cash'].
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    price = fill_prices(np.asarray(prices, dtype=float).reshape(len(prices), -1)[:, 0])
+    allocation = np.full(len(price), 0.85)
+
+    if len(price) >= 20:
+        t = np.arange(19, len(price))
+        p = price[t]
+
+        # RSI(14) sur les 14 dernières variations
+        deltas = np.diff(price)
+        gains = sliding_window_view(np.where(deltas > 0, deltas, 0), 14).mean(axis=1)
+        losses = sliding_window_view(np.where(deltas < 0, -deltas, 0), 14).mean(axis=1)
+        avg_gain, avg_loss = gains[t - 14], losses[t - 14]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+
+        # Bandes de Bollinger(20, 2.0)
+        windows = sliding_window_view(price, 20)
+        sma = windows.mean(axis=1)[t - 19]
+        std = windows.std(axis=1)[t - 19]
+        upper, lower = sma + 2.0 * std, sma - 2.0 * std
+
+        score = np.select([rsi > 70, rsi > 60, rsi < 30, rsi < 40], [-2, -1, 2, 1], 0)
+        score += np.select(
+            [p > upper, p > sma + (upper - sma) * 0.5, p < lower, p < sma - (sma - lower) * 0.5],
+            [-2, -1, 2, 1],
+            0,
+        )
+        allocation[t] = np.select(
+            [score <= -3, score <= -1, score >= 3, score >= 1], [0.0, 0.20, 1.0, 0.95], 0.85
+        )
+
+    return np.column_stack([allocation, 1.0 - allocation])
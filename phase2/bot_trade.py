@@ -111,3 +111,69 @@ def make_decision(epoch: int, price: float):
             'Asset B': 0.5,
             'Cash': 0.5
         }
+
+
+def fill_prices(prices):
+    # Même sécurisation que make_decision: un prix manquant reprend le précédent (100.0 au départ)
+    prices = np.asarray(prices, dtype=float)
+    valid = ~np.isnan(prices)
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(prices)), -1))
+    return np.where(last_valid >= 0, prices[np.maximum(last_valid, 0)], 100.0)
+
+def window_ema(prices, window, period):
+    # calculate_ema(prices[t-window+1:t+1], period) pour chaque t >= window-1:
+    # EMA amorcée sur le premier prix de la fenêtre, écrite comme un produit scalaire
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    multiplier = 2 / (period + 1)
+    kernel = multiplier * (1 - multiplier) ** np.arange(window - 1)[::-1]
+    kernel = np.concatenate([[(1 - multiplier) ** (window - 1)], kernel])
+    return sliding_window_view(prices, window) @ kernel
+
+def make_decisions(prices):
+    """
+    Version vectorisée de make_decision sur toute la série d'un coup.
+    prices: tableau (T, 1) des prix de 'Asset B'
+    Renvoie les poids (T, 2) dans l'ordre ['Asset B', 'Cash'].
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    price = fill_prices(np.asarray(prices, dtype=float).reshape(len(prices), -1)[:, 0])
+    allocation = np.full(len(price), 0.90)
+
+    if len(price) >= 50:
+        t = np.arange(49, len(price))
+        p = price[t]
+
+        # Tendance: EMA(20) sur les 30 derniers prix, EMA(50) sur les 60 derniers
+        # (tout l'historique tant qu'il y a moins de 60 prix)
+        ema_20 = window_ema(price, 30, 20)[t - 29]
+        ema_50 = np.empty(len(t))
+        head = min(10, len(t))
+        ema_50[:head] = [calculate_ema(price[:n], 50) for n in range(50, 50 + head)]
+        if len(t) > head:
+            ema_50[head:] = window_ema(price, 60, 50)
+
+        # RSI(14) sur les 14 dernières variations
+        deltas = np.diff(price)
+        gains = sliding_window_view(np.where(deltas > 0, deltas, 0), 14).mean(axis=1)
+        losses = sliding_window_view(np.where(deltas < 0, -deltas, 0), 14).mean(axis=1)
+        avg_gain, avg_loss = gains[t - 14], losses[t - 14]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+
+        # ROC(10)
+        prev_price_roc = price[t - 10]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roc_10 = np.where(prev_price_roc == 0, 0, (p - prev_price_roc) / prev_price_roc)
+
+        score = np.select([p > ema_20, p > ema_50], [2, 1], -1)
+        score += ema_20 > ema_50
+        score += np.select([rsi > 55, rsi < 45], [1, -1], 0)
+        score += roc_10 > 0
+
+        allocation[t] = np.select(
+            [score >= 4, score >= 3, score >= 1, score >= -1], [1.0, 0.98, 0.95, 0.85], 0.10
+        )
+
+    return np.column_stack([allocation, 1.0 - allocation])
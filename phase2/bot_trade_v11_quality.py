@@ -3,34 +3,26 @@ VERSION 11: Momentum Quality Score
 Combine multiple quality indicators for momentum
 """
 
-import numpy as np
+from stonks.indicators import RollingTrend
 
 price_history = []
+# Correlation with time and fraction of up moves of the last 20 prices,
+# updated in O(1) per tick
+trend = RollingTrend(20)
 
 def calculate_momentum(prices, period):
     if len(prices) < period:
         return 0
     return (prices[-1] - prices[-period]) / prices[-period]
 
-def calculate_momentum_quality(prices, period=20):
+def calculate_momentum_quality():
     """Measure quality of momentum trend"""
-    if len(prices) < period:
-        return 0
-    
-    recent = prices[-period:]
-    # Linear regression correlation
-    x = np.arange(len(recent))
-    correlation = np.corrcoef(x, recent)[0, 1]
-    
-    # Consistency: % of positive moves
-    moves = np.diff(recent)
-    consistency = np.sum(moves > 0) / len(moves) if len(moves) > 0 else 0.5
-    
-    # Combined quality score
-    return (correlation + consistency) / 2
+    # Linear regression correlation and consistency (% of positive moves)
+    return (trend.correlation + trend.up_fraction) / 2
 
 def make_decision(epoch: int, price: float):
     price_history.append(price)
+    trend.update(price)
     base_allocation = 0.95
     
     if len(price_history) >= 40:
@@ -47,7 +39,7 @@ def make_decision(epoch: int, price: float):
         acceleration = mom_recent - mom_past
         
         # Momentum quality
-        quality = calculate_momentum_quality(price_history, 20)
+        quality = calculate_momentum_quality()
         
         # High quality momentum deserves higher allocation
         quality_boost = 0.0
@@ -0,0 +1,95 @@
+"""
+VERSION 13: Parametrized Momentum/Acceleration Ladder
+Same bucket ladder as v8-v12, with thresholds and allocations read from
+PARAMS so that the family can be tuned with `python -m stonks.sweep`
+instead of copying files. Defaults reproduce v12.
+
+The momentum series are declared in INDICATORS: `stonks.sweep` computes
+them once per dataset (`stonks.cache`) and passes them in INDICATOR_SERIES,
+otherwise they are computed from price_history on every tick.
+"""
+
+price_history = []
+
+PARAMS = {
+    "mom_periods": (8, 16, 28),
+    "accel_lag": 6,
+    "warmup": 40,
+    "base_allocation": 0.96,
+    # (avg_mom > strong_momentum and acceleration > strong_acceleration)
+    "strong_momentum": 0.022,
+    "strong_acceleration": 0.001,
+    "strong_allocation": 0.995,
+    # (avg_mom > trend_momentum and acceleration > 0)
+    "trend_momentum": 0.018,
+    "trend_allocation": 0.985,
+    "drift_momentum": 0.012,
+    "drift_allocation": 0.975,
+    "weak_momentum": 0.005,
+    "weak_allocation": 0.945,
+    "flat_momentum": 0.0,
+    "flat_allocation": 0.920,
+    "dip_momentum": -0.008,
+    "dip_allocation": 0.880,
+    # Below dip_momentum: crash_allocation on strong deceleration, else bear_allocation
+    "crash_acceleration": -0.012,
+    "crash_allocation": 0.680,
+    "bear_allocation": 0.730,
+}
+
+# calculate_momentum(price_history, n) for each period, as ROC series
+INDICATORS = {
+    f"mom_{n}": ("Asset B", "roc", {"period": n}) for n in PARAMS["mom_periods"]
+}
+INDICATOR_SERIES = None
+
+def calculate_momentum(prices, period):
+    if len(prices) < period:
+        return 0
+    return (prices[-1] - prices[-period]) / prices[-period]
+
+def momentum(period, lag=0):
+    """calculate_momentum(price_history[:len(price_history) - lag], period)"""
+    if INDICATOR_SERIES is None:
+        return calculate_momentum(price_history[:len(price_history) - lag], period)
+    t = len(price_history) - 1 - lag
+    return INDICATOR_SERIES[f"mom_{period}"][t] if t >= 0 else 0
+
+def make_decision(epoch: int, price: float):
+    p = PARAMS
+    price_history.append(price)
+    base_allocation = p["base_allocation"]
+    
+    if len(price_history) >= p["warmup"]:
+        short, mid, long = p["mom_periods"]
+        mom_short = momentum(short)
+        mom_mid = momentum(mid)
+        mom_long = momentum(long)
+        avg_mom = (mom_short + mom_mid + mom_long) / 3
+        
+        # Acceleration
+        mom_recent = (mom_short + mom_mid) / 2
+        lag = p["accel_lag"]
+        mom_past_short = momentum(short, lag) if lag else 0
+        mom_past_mid = momentum(mid, lag) if lag else 0
+        mom_past = (mom_past_short + mom_past_mid) / 2
+        acceleration = mom_recent - mom_past
+        
+        if avg_mom > p["strong_momentum"] and acceleration > p["strong_acceleration"]:
+            base_allocation = p["strong_allocation"]
+        elif avg_mom > p["trend_momentum"] and acceleration > 0:
+            base_allocation = p["trend_allocation"]
+        elif avg_mom > p["drift_momentum"]:
+            base_allocation = p["drift_allocation"]
+        elif avg_mom > p["weak_momentum"]:
+            base_allocation = p["weak_allocation"]
+        elif avg_mom > p["flat_momentum"]:
+            base_allocation = p["flat_allocation"]
+        elif avg_mom > p["dip_momentum"]:
+            base_allocation = p["dip_allocation"]
+        elif acceleration < p["crash_acceleration"]:
+            base_allocation = p["crash_allocation"]
+        else:
+            base_allocation = p["bear_allocation"]
+    
+    return {'Asset B': base_allocation, 'Cash': 1.0 - base_allocation}
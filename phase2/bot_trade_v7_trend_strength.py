@@ -3,26 +3,20 @@ VERSION 7: Momentum with Trend Strength
 Add trend strength indicator to momentum
 """
 
-import numpy as np
+from stonks.indicators import RollingTrend
 
 price_history = []
+# Correlation of the last 20 prices with time, updated in O(1) per tick
+trend = RollingTrend(20)
 
 def calculate_momentum(prices, period):
     if len(prices) < period:
         return 0
     return (prices[-1] - prices[-period]) / prices[-period]
 
-def calculate_trend_strength(prices, period=20):
-    """Measure how linear the trend is"""
-    if len(prices) < period:
-        return 0
-    recent = prices[-period:]
-    x = np.arange(len(recent))
-    correlation = np.corrcoef(x, recent)[0, 1]
-    return correlation
-
 def make_decision(epoch: int, price: float):
     price_history.append(price)
+    trend.update(price)
     base_allocation = 0.95
     
     if len(price_history) >= 30:
@@ -33,7 +27,7 @@ def make_decision(epoch: int, price: float):
         avg_mom = (mom_8 + mom_18 + mom_30) / 3
         
         # Trend strength (correlation with time)
-        trend_strength = calculate_trend_strength(price_history, 20)
+        trend_strength = trend.correlation
         
         # Boost allocation when trend is strong and consistent
         if avg_mom > 0.015 and trend_strength > 0.7:
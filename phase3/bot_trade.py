@@ -1,14 +1,21 @@
 import numpy as np
 
-history=[]
+from stonks.history import RingBuffer
+
+assets=("Asset A","Asset B")
+window=9
+lookback=window//2
+# Historique en colonnes (une par actif) à capacité fixe: seuls les `lookback` derniers prix
+# servent, et la fenêtre est une vue, sans copie ni réallocation.
+history=RingBuffer(lookback,width=len(assets))
 def make_decision(epoch,priceA,priceB):
     history.append((priceA,priceB))
-    window=9
-    if len(history)<window: return {"Asset A":1/3,"Asset B":1/3,"Cash":1/3}
-    A,B=np.array(history).T
-    ra,rb=A[-1]/A[-(window//2)]-1,B[-1]/B[-(window//2)]-1
-    ra,rb=max(0,ra),max(0,rb)
-    s=ra+rb
-    if s==0: return {"Asset A":0,"Asset B":0,"Cash":1}
-    wA,wB=ra/s*.9999,rb/s*.9999
-    return {"Asset A":wA,"Asset B":wB,"Cash":1-wA-wB}
+    if history.count<window: return {a:1/3 for a in (*assets,"Cash")}
+    recent=history.last(lookback)
+    r=np.fmax(recent[-1]/recent[0]-1,0)
+    s=r.sum()
+    if s==0: return {**{a:0 for a in assets},"Cash":1}
+    w=r/s*.9999
+    cash=1
+    for wi in w: cash-=wi
+    return {**dict(zip(assets,w)),"Cash":cash}
@@ -0,0 +1,7 @@
+"""
+Tooling shared by the three phases: the runner and scoring engine behind
+each phase's main.py and `scoring` module, and sweeps, evaluation harnesses
+and benchmarks around the phases' bots.
+
+Run the tools from the repository root, e.g. ``python -m stonks.sweep``.
+"""
@@ -0,0 +1,511 @@
+"""
+Pandas-free half of the backtest engine.
+
+What a plain run of main.py needs: reading a price CSV into arrays, the
+rebalancing recurrence, `backtest_arrays`, the streaming
+`IncrementalBacktest`, the local score of one run and its display. It only
+imports NumPy, so main.py starts without loading pandas, and matplotlib is
+only imported for `--show-graph`. `stonks.engine` adds the DataFrame API on
+top of it.
+"""
+
+import csv
+import math
+import os
+from typing import Any
+
+import numpy as np
+
+from stonks.profiles import Profile
+
+
+def load_price_arrays(path_csv: str) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """
+    Read a price CSV with the layout of `find_csv_file` in main.py.
+
+    Returns
+    -------
+    epochs : np.ndarray
+        The first (index) column, as int64.
+    columns : list of str
+        The asset columns of the header, followed by "Cash".
+    values : np.ndarray
+        Float64 prices of shape (T, n_columns), Cash being 1.
+    """
+    if not os.path.exists(path_csv):
+        raise FileNotFoundError(f"Le fichier CSV {path_csv} n'existe pas")
+    with open(path_csv, newline="") as f:
+        header = next(csv.reader([f.readline()]))
+        epochs, values = _price_rows(f, len(header))
+    return epochs, [*header[1:], "Cash"], values
+
+
+def _price_rows(rows, n_columns: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Epochs and prices (Cash appended) of CSV data rows, from a list of lines
+    or a seekable file. Empty cells are NaN, as with `pd.read_csv`: the C
+    parser of `np.loadtxt` rejects them, so a table with gaps is read again
+    with `np.genfromtxt`.
+    """
+    start = rows.tell() if hasattr(rows, "seek") else None
+    try:
+        table = np.loadtxt(rows, delimiter=",", ndmin=2)
+    except ValueError:
+        if start is not None:
+            rows.seek(start)
+        table = np.genfromtxt(
+            rows, delimiter=",", ndmin=2, missing_values="", filling_values=np.nan
+        )
+
+    values = np.empty((len(table), n_columns))
+    values[:, :-1] = table[:, 1:]
+    values[:, -1] = 1.0
+    return table[:, 0].astype(np.int64), values
+
+
+def _holdings_sum(prices: np.ndarray, weights: np.ndarray):
+    """
+    Sum over assets for the rebalancing arithmetic. The reference loop sums
+    holdings with pandas, which skips NaN: a missing price (or weight) makes
+    that position count as zero, and it is lost from the next epoch on.
+    `np.nansum` reproduces that, and plain `np.sum` is kept when there is no
+    NaN since it is cheaper.
+    """
+    if np.isnan(prices).any() or np.isnan(weights).any():
+        return np.nansum
+    return np.sum
+
+
+def _pnl_path(
+    prices: np.ndarray,
+    weights: np.ndarray,
+    initial_capital: float,
+    transaction_fees: float,
+) -> np.ndarray:
+    """
+    Array engine behind `backtest`.
+
+    Same recurrence as the per-row loop, written per unit of capital so that it
+    reduces to a cumulative product. With `w` the target weights and `g` the
+    price growth since the previous epoch, yesterday's holdings are worth
+    `w[t-1] * g[t]` today (per unit of capital after the previous rebalance).
+    Rebalancing to `w[t]` trades `|w[t] * sum(w[t-1] * g[t]) - w[t-1] * g[t]|`
+    of notional, on which the fees are paid.
+
+    Parameters
+    ----------
+    prices : np.ndarray
+        Float64 prices, shape (T, n_assets), or (K, T, n_assets) to give each
+        strategy its own price path.
+    weights : np.ndarray
+        Float64 target weights with the same column order as `prices`, shape
+        (T, n_assets) or (K, T, n_assets) to run K strategies at once.
+    initial_capital : float
+        Starting capital.
+    transaction_fees : float
+        Proportional transaction cost applied to traded notional.
+
+    Returns
+    -------
+    np.ndarray
+        Cumulative PnL starting at 1.0, shape (T,) or (K, T).
+    """
+    total = _holdings_sum(prices, weights)
+
+    # Price growth is shared by every strategy on the same path
+    growth = prices[..., 1:, :] / prices[..., :-1, :]
+    drifted = weights[..., :-1, :] * growth
+    gross = total(drifted, axis=-1)
+    traded = total(np.abs(weights[..., 1:, :] * gross[..., None] - drifted), axis=-1)
+
+    # Capital right after rebalancing; the initial allocation pays fees on
+    # the whole capital, as in the per-row loop.
+    capital = np.empty(weights.shape[:-1])
+    capital[..., 0] = initial_capital * (1 - transaction_fees)
+    np.cumprod(gross - transaction_fees * traded, axis=-1, out=capital[..., 1:])
+    capital[..., 1:] *= capital[..., :1]
+
+    # Capital path: positions whose price is missing are worth nothing
+    held = np.where(np.isnan(prices), 0.0, weights) if total is np.nansum else weights
+    capital_evolution = capital * total(held, axis=-1)
+    capital_evolution[..., 0] = initial_capital
+
+    # Returns and cumulative PnL
+    returns = np.zeros_like(capital_evolution)
+    returns[..., 1:] = capital_evolution[..., 1:] / capital_evolution[..., :-1] - 1.0
+    returns[np.isnan(returns)] = 0.0
+    return np.cumprod(1 + returns, axis=-1)
+
+
+def backtest_arrays(
+    prices: np.ndarray,
+    weights: np.ndarray,
+    initial_capital: float = 1.0,
+    *,
+    transaction_fees: float,
+    trading_days: int = 252,
+) -> dict[str, Any]:
+    """
+    Backtest on raw arrays, vectorized over any number of strategies/paths.
+
+    Parameters
+    ----------
+    prices : np.ndarray
+        Prices of shape (T, n_assets) or (K, T, n_assets).
+    weights : np.ndarray
+        Target weights in the column order of `prices`, shape (T, n_assets)
+        or (K, T, n_assets).
+    initial_capital : float
+        Starting capital.
+    transaction_fees : float
+        Proportional transaction cost applied to traded notional.
+    trading_days : int
+        Number of trading days per year (for annualization).
+
+    Returns
+    -------
+    dict
+        Contains:
+        - "pnl": cumulative returns, shape (T,) or (K, T)
+        - "stats": the return-based subset of `compute_stats`
+          (cumulative_return, annualized_return, annualized_volatility,
+          sharpe_ratio, max_drawdown), one value per strategy/path
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if prices.shape[-2:] != weights.shape[-2:]:
+        raise ValueError(
+            f"Prices and positions not the same shape: got {prices.shape} and {weights.shape}"
+        )
+    if prices.shape[-2] < 3:
+        raise ValueError("Need at least 3 epochs to compute stats")
+
+    pnl = _pnl_path(prices, weights, initial_capital, transaction_fees)
+
+    rets = pnl[..., 1:] / pnl[..., :-1] - 1.0
+    n = rets.shape[-1]
+    cumulative_return = pnl[..., -1] / pnl[..., 0] - 1.0
+    # Product of the returns, as compute_stats: pnl[-1] / pnl[0] rounds to 0
+    # once the capital has collapsed
+    geom_daily = np.prod(1.0 + rets, axis=-1) ** (1.0 / n) - 1.0
+    annualized_return = (1.0 + geom_daily) ** trading_days - 1.0
+    annualized_volatility = rets.std(axis=-1, ddof=1) * math.sqrt(trading_days)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe_ratio = np.where(
+            annualized_volatility > 0, annualized_return / annualized_volatility, np.nan
+        )
+    max_drawdown = (pnl / np.maximum.accumulate(pnl, axis=-1) - 1.0).min(axis=-1)
+
+    return {
+        "pnl": pnl,
+        "stats": {
+            "cumulative_return": cumulative_return,
+            "annualized_return": annualized_return,
+            "annualized_volatility": annualized_volatility,
+            "sharpe_ratio": sharpe_ratio,
+            "max_drawdown": max_drawdown,
+        },
+    }
+
+
+class IncrementalBacktest:
+    """
+    Streaming counterpart of `backtest`, fed one epoch at a time.
+
+    Each call to `update` applies the same fee-on-traded-notional rebalancing
+    as `backtest` and updates the capital, the running max, the drawdown and
+    the moments of the returns in O(n_assets). The return-based statistics
+    follow the definitions of `compute_stats`.
+
+    Parameters
+    ----------
+    profile : Profile
+        Phase whose transaction fees and base score are applied.
+    initial_capital : float
+        Starting capital.
+    trading_days : int
+        Number of trading days per year (for annualization).
+    """
+
+    def __init__(
+        self,
+        profile: Profile,
+        initial_capital: float = 1.0,
+        trading_days: int = 252,
+    ):
+        self.profile = profile
+        self.initial_capital = initial_capital
+        self.transaction_fees = profile.transaction_fees
+        self.trading_days = trading_days
+
+        self.nb_units = None
+        self.capital = initial_capital
+        self.pnl = 1.0
+        self.running_max = 1.0
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        self.n_epochs = 0
+
+        # Welford moments of the simple returns
+        self.n_returns = 0
+        self.mean_return = 0.0
+        self.m2_return = 0.0
+
+    def update(self, prices: np.ndarray, weights: np.ndarray) -> float:
+        """
+        Rebalance to `weights` at `prices` and return the updated PnL.
+
+        `prices` and `weights` are 1-d sequences in the same column order.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        self.n_epochs += 1
+
+        if self.nb_units is None:
+            # Initial allocation
+            self.nb_units = (
+                weights * self.initial_capital / prices * (1 - self.transaction_fees)
+            )
+            return self.pnl
+
+        total = _holdings_sum(prices, self.nb_units)
+        capital_before_rebalance = total(self.nb_units * prices)
+        ideal_nb_units = weights * capital_before_rebalance / prices
+        transaction_costs = (
+            total(np.abs((ideal_nb_units - self.nb_units) * prices))
+            * self.transaction_fees
+        )
+        capital_after_tc = capital_before_rebalance - transaction_costs
+        self.nb_units = weights * capital_after_tc / prices
+
+        capital = total(self.nb_units * prices)
+        ret = capital / self.capital - 1.0
+        if np.isnan(ret):
+            ret = 0.0
+        self.capital = capital
+        self.pnl *= 1.0 + ret
+
+        self.n_returns += 1
+        delta = ret - self.mean_return
+        self.mean_return += delta / self.n_returns
+        self.m2_return += delta * (ret - self.mean_return)
+
+        self.running_max = max(self.running_max, self.pnl)
+        self.drawdown = self.pnl / self.running_max - 1.0
+        self.max_drawdown = min(self.max_drawdown, self.drawdown)
+        return self.pnl
+
+    def update_block(self, prices: np.ndarray, weights: np.ndarray) -> float:
+        """
+        `update` on every row of a block of epochs at once.
+
+        `prices` and `weights` have shape (B, n_assets). The rebalancing is
+        chained from the current holdings with the cumulative product of
+        `_pnl_path`, and the moments and drawdown are merged with the
+        block's, so the cost is O(B) NumPy work instead of B Python calls.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if self.nb_units is None and len(prices):
+            self.update(prices[0], weights[0])
+            prices, weights = prices[1:], weights[1:]
+        if not len(prices):
+            return self.pnl
+
+        # Capital after rebalancing: the first row starts from the current
+        # holdings, the next ones from the previous row's weights
+        total = _holdings_sum(prices, weights)
+        holdings = self.nb_units * prices[0]
+        if np.isnan(holdings).any():
+            total = np.nansum
+        first = total(holdings)
+        first -= self.transaction_fees * total(np.abs(weights[0] * first - holdings))
+        drifted = weights[:-1] * (prices[1:] / prices[:-1])
+        gross = total(drifted, axis=1)
+        traded = total(np.abs(weights[1:] * gross[:, None] - drifted), axis=1)
+        after_fees = np.empty(len(prices))
+        after_fees[0] = first
+        np.cumprod(gross - self.transaction_fees * traded, out=after_fees[1:])
+        after_fees[1:] *= first
+
+        held = np.where(np.isnan(prices), 0.0, weights) if total is np.nansum else weights
+        capital = after_fees * total(held, axis=1)
+        returns = capital / np.concatenate(([self.capital], capital[:-1])) - 1.0
+        returns[np.isnan(returns)] = 0.0
+        pnl = self.pnl * np.cumprod(1.0 + returns)
+
+        # Chan et al. merge of the block's moments into the running ones
+        n = self.n_returns + len(returns)
+        block_mean = returns.mean()
+        delta = block_mean - self.mean_return
+        self.m2_return += (
+            ((returns - block_mean) ** 2).sum() + delta**2 * self.n_returns * len(returns) / n
+        )
+        self.mean_return += delta * len(returns) / n
+        self.n_returns = n
+
+        running_max = np.maximum.accumulate(np.maximum(pnl, self.running_max))
+        drawdown = pnl / running_max - 1.0
+        self.max_drawdown = min(self.max_drawdown, drawdown.min())
+        self.running_max = running_max[-1]
+        self.drawdown = drawdown[-1]
+        self.pnl = pnl[-1]
+        self.capital = capital[-1]
+        self.nb_units = weights[-1] * after_fees[-1] / prices[-1]
+        self.n_epochs += len(prices)
+        return self.pnl
+
+    def stats(self) -> dict[str, float]:
+        """Return-based subset of `compute_stats` for the epochs seen so far."""
+        if self.n_returns < 2:
+            raise ValueError("Need at least 3 epochs to compute stats")
+
+        cumulative_return = self.pnl - 1.0
+        geom_daily = self.pnl ** (1.0 / self.n_returns) - 1.0
+        annualized_return = (1.0 + geom_daily) ** self.trading_days - 1.0
+        daily_std = math.sqrt(self.m2_return / (self.n_returns - 1))
+        annualized_volatility = daily_std * math.sqrt(self.trading_days)
+        sharpe_ratio = (
+            annualized_return / annualized_volatility
+            if annualized_volatility > 0
+            else np.nan
+        )
+        return {
+            "cumulative_return": cumulative_return,
+            "annualized_return": annualized_return,
+            "annualized_volatility": annualized_volatility,
+            "sharpe_ratio": sharpe_ratio,
+            "max_drawdown": self.max_drawdown,
+        }
+
+    def scores(self) -> dict[str, float]:
+        """Base score of the epochs seen so far."""
+        stats = self.stats()
+        return self.profile.base_score(
+            sharpe=stats["sharpe_ratio"],
+            cum_ret=stats["cumulative_return"],
+            mdd=stats["max_drawdown"],
+            initial_capital=self.initial_capital,
+        )
+
+def _trading_stats(
+    pnl: np.ndarray,
+    weights: np.ndarray,
+    columns: list[str],
+    trading_days: int = 252,
+    var_alpha: float = 0.05,
+) -> dict[str, float]:
+    """
+    The stats of `compute_stats` that `backtest_arrays` leaves out (VaR/CVaR
+    and the exposure-based ones), for one pnl path of shape (T,) and its
+    weights of shape (T, n_columns).
+    """
+    rets = pnl[1:] / pnl[:-1] - 1.0
+    # np.quantile interpolates linearly, as pandas' Series.quantile
+    var_daily = np.quantile(rets, var_alpha)
+    var_5 = var_daily * math.sqrt(trading_days)
+    cvar_5 = rets[rets <= var_daily].mean() * math.sqrt(trading_days)
+
+    time_in_market = (np.abs(weights).sum(axis=1) > 0).mean()
+    market = [i for i, c in enumerate(columns) if str(c).upper() != "CASH"]
+    market_exposure = np.abs(weights[:, market]).sum(axis=1)
+    avg_exposition_market = market_exposure.mean() if market else 0.0
+
+    # Exposure changes between consecutive return epochs (epochs 1..T-1)
+    delta_exp = np.diff(market_exposure[1:])
+    exposure_change = delta_exp != 0
+    n_changes = int(exposure_change.sum())
+    if n_changes > 0:
+        next_rets = rets[1:]
+        successes = ((delta_exp > 0) & (next_rets > 0)) | ((delta_exp < 0) & (next_rets < 0))
+        exposure_timing_accuracy = (successes & exposure_change).sum() / n_changes
+        expected_value_per_trade = next_rets[exposure_change].mean()
+    else:
+        exposure_timing_accuracy = np.nan
+        expected_value_per_trade = np.nan
+
+    return {
+        "var_5": var_5,
+        "cvar_5": cvar_5,
+        "time_in_market": time_in_market,
+        "avg_exposition_market": avg_exposition_market,
+        "exposure_timing_accuracy": exposure_timing_accuracy,
+        "expected_value_per_trade": expected_value_per_trade,
+    }
+
+
+def local_score_arrays(
+    epochs: np.ndarray,
+    columns: list[str],
+    prices: np.ndarray,
+    weights: np.ndarray,
+    profile: Profile,
+    initial_capital: float = 1_000,
+) -> dict[str, dict]:
+    """
+    `get_local_score` of one run given as arrays: the pnl by epoch, the
+    stats of `compute_stats` and the profile's scores.
+    """
+    result = backtest_arrays(
+        prices, weights, initial_capital, transaction_fees=profile.transaction_fees
+    )
+    stats = {**result["stats"], **_trading_stats(result["pnl"], weights, columns)}
+    scores = profile.base_score(
+        sharpe=stats["sharpe_ratio"],
+        cum_ret=stats["cumulative_return"],
+        mdd=stats["max_drawdown"],
+        initial_capital=initial_capital,
+    )
+    return {
+        "pnl": dict(zip(epochs.tolist(), result["pnl"].tolist())),
+        "stats": stats,
+        "scores": scores,
+    }
+
+
+# ============================================================================
+# affichage
+# ============================================================================
+
+def show_result(local_score: dict, is_show_graph: bool = False):
+    # Affichage formaté de tous les scores
+    print("\n" + "=" * 70)
+    print("📊 RÉSULTATS")
+    print("=" * 70)
+
+    print("\n🎯 SCORES:")
+    print("-" * 70)
+    scores = local_score["scores"]
+    print(f"  Sharpe Score:     {scores['sharpe_score']:.4f}")
+    print(f"  PnL Score:        {scores['pnl_score']:.4f}")
+    print(f"  Max Drawdown Score: {scores['mdd_score']:.4f}")
+    print(f"  ⭐ Base Score:     {scores['base_score']:.4f}")
+  
+    print("\n" + "=" * 70)
+
+    print("🎯 Performance:")
+    print(f"  Brut PnL:        { local_score["stats"]["cumulative_return"]*100:.2f}%")
+
+    if is_show_graph:
+        print("\033[94mune page graphique va s'ouvrir pour vous montrer les résultats du pnl\033[0m")
+        import matplotlib.pyplot as plt
+
+        # Graphique du PnL avec matplotlib
+        pnl_dict = local_score["pnl"]
+        epochs = np.array(sorted(pnl_dict))
+        pnl = np.array([pnl_dict[epoch] for epoch in epochs])
+
+        plt.figure(figsize=(12, 6))
+        plt.plot(epochs, pnl, linewidth=2, color='#2E86AB')
+        plt.axhline(y=1.0, color='gray', linestyle='--', linewidth=1, alpha=0.5, label='Capital initial')
+        plt.fill_between(epochs, pnl, 1.0, 
+                        where=(pnl >= 1.0), alpha=0.3, color='green', label='Profit')
+        plt.fill_between(epochs, pnl, 1.0, 
+                        where=(pnl < 1.0), alpha=0.3, color='red', label='Perte')
+        plt.xlabel('Epoch', fontsize=12, fontweight='bold')
+        plt.ylabel('PnL (Multiplicateur)', fontsize=12, fontweight='bold')
+        plt.title('Évolution du PnL au fil du temps', fontsize=14, fontweight='bold', pad=20)
+        plt.grid(True, alpha=0.3, linestyle='--')
+        plt.legend(loc='best')
+        plt.tight_layout()
+        plt.show()
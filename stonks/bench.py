@@ -0,0 +1,399 @@
+"""
+Benchmark suite timing each stage of a run separately: CSV parsing, the
+cached load of main.py (`stonks.datasets`), its decision loop
+(`stonks.runner`: `make_decisions` in one call when the bot has it, as
+main.py does, else `make_decision` tick by tick), `backtest`,
+`compute_stats` and the base score, for every bot of every phase at several
+dataset sizes. Every stage is timed as the best of `--repeat` runs.
+
+Datasets are generated once with `stonks.generate` in each phase's CSV
+layout and scored under the phase's profile; every bot is a fresh copy of
+its module. Results are written as JSON and can be compared against a
+stored baseline:
+
+    python -m stonks.bench --output bench.json
+    python -m stonks.bench --sizes 2520 100000 --baseline bench.json --threshold 0.25
+
+Each phase's startup is also measured: the time to import its main.py (and
+its bot) in a fresh interpreter, as the grader does once per submission.
+Startup must stay under `--startup-budget` without loading pandas or
+matplotlib; `--startup-only` runs just that check:
+
+    python -m stonks.bench --startup-only --startup-budget 0.2
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from stonks import engine, runner
+from stonks.generate import write_csv
+from stonks.arrays import load_price_arrays
+from stonks.datasets import load_dataset
+from stonks.phases import PHASES, REPO_ROOT, load_module
+from stonks.profiles import PROFILES
+from stonks.tournament import find_bots
+
+SIZES = (2_520, 100_000, 1_000_000)
+DATASET_PARAMS = {"drift": 0.0001, "volatility": 0.005, "autocorrelation": 0.35, "seed": 0}
+START_PRICES = {"Asset A": 1.0, "Asset B": 2.0}
+
+# Stages faster than this are too noisy to be flagged as regressions
+NOISE_FLOOR = 0.001
+
+# Seconds allowed to import a phase's main.py, and modules it must not load
+STARTUP_BUDGET = 0.25
+HEAVY_MODULES = ("pandas", "matplotlib")
+
+_STARTUP_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+print(*[m for m in {HEAVY_MODULES!r} if m in sys.modules])
+"""
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class _Deadline:
+    """Wraps `make_decision` and aborts the decision loop past `deadline`."""
+
+    def __init__(self, make_decision, deadline: float):
+        self.make_decision = make_decision
+        self.deadline = deadline
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        if not self.calls & 1023 and time.perf_counter() > self.deadline:
+            raise DeadlineExceeded
+        return self.make_decision(*args)
+
+
+def phase_columns(phase_dir: str) -> list[str]:
+    """Asset columns of a phase, read from the header of its bundled CSV."""
+    path_csv = sorted(glob.glob(os.path.join(phase_dir, "data", "*.csv")))[0]
+    return list(pd.read_csv(path_csv, index_col=0, nrows=0).columns)
+
+
+def ensure_dataset(data_dir: str, phase: str, columns: list[str], n_epochs: int) -> str:
+    """Generate (once) the synthetic dataset of a phase at a given size."""
+    path = os.path.join(data_dir, f"{phase}_{n_epochs}.csv")
+    if not os.path.exists(path):
+        write_csv(
+            path,
+            n_epochs,
+            columns=columns,
+            start_prices=[START_PRICES.get(c, 1.0) for c in columns],
+            **DATASET_PARAMS,
+        )
+    return path
+
+
+def _best_of(repeat: int, func) -> tuple[float, Any]:
+    best, result = np.inf, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def time_decisions(
+    bot_path: str,
+    epochs: np.ndarray,
+    columns: list[str],
+    values: np.ndarray,
+    timeout: float,
+    repeat: int,
+) -> tuple[dict[str, Any], np.ndarray | None]:
+    """
+    Best-of-`repeat` decision loop of main.py, on a fresh copy of the bot
+    each run: one `make_decisions` call when the module has it, else
+    `make_decision` tick by tick, aborted past `timeout`. Runs stop being
+    repeated once another one would take the total past `timeout`.
+
+    Returns the "decide" stage fields and the weights (None on timeout).
+    """
+    best, weights, spent = np.inf, None, 0.0
+    for runs in range(1, repeat + 1):
+        module = load_module(bot_path)
+        batch = hasattr(module, "make_decisions")
+        start = time.perf_counter()
+        if batch:
+            weights = runner.run_batch_decisions(module.make_decisions, epochs, columns, values)
+        else:
+            generator = _Deadline(module.make_decision, start + timeout)
+            try:
+                weights = runner.run_fast_decisions(generator, epochs, columns, values)
+            except DeadlineExceeded:
+                seconds = time.perf_counter() - start
+                return {
+                    "seconds": seconds,
+                    "epochs_done": generator.calls,
+                    "timed_out": True,
+                    "batch": False,
+                    "runs": runs,
+                }, None
+        seconds = time.perf_counter() - start
+        best = min(best, seconds)
+        spent += seconds
+        if spent + best > timeout:
+            break
+
+    return {
+        "seconds": best,
+        "epochs_done": len(epochs),
+        "timed_out": False,
+        "batch": batch,
+        "runs": runs,
+    }, weights
+
+
+def bench_phase(
+    phase: str,
+    bots: list[str],
+    datasets: dict[int, str],
+    timeout: float,
+    repeat: int,
+) -> list[dict[str, Any]]:
+    """Time every stage for the bots of one phase."""
+    profile = PROFILES[phase]
+    results = []
+    timed_out = set()
+    for n_epochs, path_csv in sorted(datasets.items()):
+        record = {"phase": phase, "bot": None, "epochs": n_epochs}
+        seconds, _ = _best_of(repeat, lambda: load_price_arrays(path_csv))
+        results.append({**record, "stage": "parse", "seconds": seconds})
+        seconds, (epochs, columns, values) = _best_of(repeat, lambda: load_dataset(path_csv))
+        results.append({**record, "stage": "load", "seconds": seconds})
+        prices = pd.DataFrame(values, index=pd.Index(epochs, name="epoch"), columns=columns)
+
+        for bot_path in bots:
+            bot = os.path.basename(bot_path)
+            record = {"phase": phase, "bot": bot, "epochs": n_epochs}
+            if bot in timed_out:
+                results.append({**record, "stage": "decide", "skipped": True})
+                continue
+
+            decide, weights = time_decisions(
+                bot_path, epochs, columns, values, timeout, repeat
+            )
+            if decide["timed_out"]:
+                timed_out.add(bot)
+            results.append({**record, "stage": "decide", **decide})
+            if weights is None:
+                continue
+            positions = pd.DataFrame(weights, index=prices.index, columns=columns)
+
+            seconds, backtest = _best_of(
+                repeat,
+                lambda: engine.backtest(
+                    prices,
+                    positions,
+                    initial_capital=1_000,
+                    transaction_fees=profile.transaction_fees,
+                ),
+            )
+            results.append({**record, "stage": "backtest", "seconds": seconds})
+
+            seconds, stats = _best_of(
+                repeat, lambda: engine.compute_stats(backtest["pnl"], positions)
+            )
+            results.append({**record, "stage": "compute_stats", "seconds": seconds})
+
+            n_calls = 1_000
+            seconds = timeit.timeit(
+                lambda: profile.base_score(
+                    sharpe=stats["sharpe_ratio"],
+                    cum_ret=stats["cumulative_return"],
+                    mdd=stats["max_drawdown"],
+                    initial_capital=1_000,
+                ),
+                number=n_calls,
+            )
+            results.append({**record, "stage": "get_base_score", "seconds": seconds / n_calls})
+
+    return results
+
+
+def measure_startup(phase: str, repeat: int) -> dict[str, Any]:
+    """Best-of-`repeat` import time of a phase's main.py in fresh interpreters."""
+    best, heavy = np.inf, []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE],
+            cwd=os.path.join(REPO_ROOT, phase),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+        best = min(best, float(output[0]))
+        heavy = output[1].split() if len(output) > 1 else []
+    return {
+        "phase": phase,
+        "bot": None,
+        "epochs": 0,
+        "stage": "startup",
+        "seconds": best,
+        "heavy_imports": heavy,
+    }
+
+
+def check_startup(results: list[dict[str, Any]], budget: float) -> list[dict[str, Any]]:
+    """Startup results over `budget` or loading one of `HEAVY_MODULES`."""
+    return [
+        r for r in results
+        if r["stage"] == "startup" and (r["seconds"] > budget or r["heavy_imports"])
+    ]
+
+
+def _cost(result: dict[str, Any]) -> float | None:
+    """Comparable cost of a result: per-epoch time for the decision loop."""
+    if result.get("seconds") is None:
+        return None
+    if result["stage"] == "decide":
+        return result["seconds"] / max(result["epochs_done"], 1)
+    return result["seconds"]
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float
+) -> list[dict[str, Any]]:
+    """Results slower than their baseline counterpart by more than `threshold`."""
+    key = lambda r: (r["phase"], r["bot"], r["epochs"], r["stage"])
+    reference = {key(r): _cost(r) for r in baseline if _cost(r) is not None}
+
+    regressions = []
+    for r in results:
+        cost, ref = _cost(r), reference.get(key(r))
+        if cost is None or ref is None or r["seconds"] < NOISE_FLOOR:
+            continue
+        if cost > ref * (1 + threshold):
+            regressions.append({**r, "baseline_cost": ref, "cost": cost, "ratio": cost / ref})
+    return regressions
+
+
+def run(
+    sizes: list[int] = SIZES,
+    phases: list[str] = PHASES,
+    bot_pattern: str = "*",
+    timeout: float = 60.0,
+    repeat: int = 3,
+    data_dir: str | None = None,
+    startup_only: bool = False,
+) -> dict[str, Any]:
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), "stonks_bench")
+    os.makedirs(data_dir, exist_ok=True)
+
+    results = []
+    for phase in phases:
+        results.append(measure_startup(phase, max(repeat, 5)))
+        if startup_only:
+            continue
+        phase_dir = os.path.join(REPO_ROOT, phase)
+        bots = find_bots(phase_dir, bot_pattern)
+        columns = phase_columns(phase_dir)
+        datasets = {n: ensure_dataset(data_dir, phase, columns, n) for n in sizes}
+        print(f"{phase}: {len(bots)} bots, sizes {list(sizes)}", file=sys.stderr)
+        results += bench_phase(phase, bots, datasets, timeout, repeat)
+
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "timeout": timeout,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def print_summary(results: list[dict[str, Any]]):
+    for r in results:
+        name = r["bot"] or "-"
+        if r.get("skipped"):
+            timing = "skipped (timed out on a smaller size)"
+        elif r.get("timed_out"):
+            timing = f"timeout after {r['epochs_done']} epochs ({r['seconds']:.1f}s)"
+        else:
+            timing = f"{r['seconds'] * 1e3:10.3f} ms"
+        print(f"{r['phase']}  {name:36} {r['epochs']:>9}  {r['stage']:15} {timing}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--phases", nargs="+", default=list(PHASES))
+    parser.add_argument("--bots", default="*", help="glob on bot file names, e.g. 'bot_trade_v1*'")
+    parser.add_argument("--timeout", type=float, default=60.0, help="max seconds per decision loop")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N for every stage")
+    parser.add_argument("--data-dir", help="where generated datasets are cached")
+    parser.add_argument("--output", help="JSON file to write (stdout by default)")
+    parser.add_argument("--baseline", help="previous JSON output to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs baseline")
+    parser.add_argument(
+        "--startup-budget", type=float, default=STARTUP_BUDGET,
+        help="max seconds to import a phase's main.py",
+    )
+    parser.add_argument("--startup-only", action="store_true", help="only check the startup budget")
+    args = parser.parse_args()
+
+    report = run(
+        args.sizes, args.phases, args.bots, args.timeout, args.repeat, args.data_dir,
+        args.startup_only,
+    )
+    print_summary(report["results"])
+
+    over_budget = check_startup(report["results"], args.startup_budget)
+    report["over_budget"] = over_budget
+    for r in over_budget:
+        heavy = f", imports {', '.join(r['heavy_imports'])}" if r["heavy_imports"] else ""
+        print(
+            f"STARTUP {r['phase']}: {r['seconds'] * 1e3:.1f} ms"
+            f" (budget {args.startup_budget * 1e3:.0f} ms){heavy}",
+            file=sys.stderr,
+        )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(
+                f"REGRESSION {r['phase']} {r['bot'] or '-'} {r['epochs']} {r['stage']}:"
+                f" x{r['ratio']:.2f} vs baseline",
+                file=sys.stderr,
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    sys.exit(1 if regressions or over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Resettable bots.
+
+A bot keeps its state between ticks, which the phase bots do in module
+globals (`price_history = []`): a second run in the same process needs a
+fresh module, i.e. a new import. The `Bot` abstract base class keeps that
+state on an object instead, so a single process can run thousands of
+backtests:
+
+    class Momentum(Bot):
+        PARAMS = {"lookback": 20}
+
+        def reset(self):
+            self.history = RingBuffer(self.params["lookback"])
+
+        def on_tick(self, epoch, price):
+            self.history.append(price)
+            ...
+            return {"Asset B": weight, "Cash": 1 - weight}
+
+    bot = Momentum({"lookback": 30})
+    for run in runs:
+        bot.reset()
+        weights = run_bot(bot.on_tick, prices)
+
+`ModuleBot` adapts an existing `make_decision` module to `Bot`: the file is
+read and compiled once per process and version (an edited file is compiled
+again for the next `ModuleBot`), and `reset` re-executes the compiled
+module body in a new namespace, which gives the bot fresh globals without
+going through the import system again.
+"""
+
+import ast
+import functools
+import os
+import sys
+from abc import ABC, abstractmethod
+from types import CodeType, ModuleType
+from typing import Any
+
+
+class Bot(ABC):
+    """
+    Base class of resettable bots.
+
+    Subclasses declare their default `PARAMS`, build their whole state in
+    `reset` and return a decision from `on_tick`, with the same signature
+    and return values as `make_decision` (a dict, or weights in the column
+    order of the prices). Both methods are abstract: a subclass missing one
+    cannot be instantiated.
+
+    Parameters
+    ----------
+    params : dict, optional
+        Overrides of `PARAMS`; unknown names are rejected.
+    """
+
+    PARAMS: dict[str, Any] = {}
+
+    def __init__(self, params: dict[str, Any] | None = None):
+        self.params = merge_params(self.PARAMS, params, type(self).__name__)
+        self.reset()
+
+    @abstractmethod
+    def reset(self):
+        """Forget every past tick, as a freshly created bot."""
+
+    @abstractmethod
+    def on_tick(self, epoch: int, *asset_prices: float):
+        """Decision for one epoch, given the price of every asset."""
+
+
+def merge_params(
+    defaults: dict[str, Any], params: dict[str, Any] | None, name: str
+) -> dict[str, Any]:
+    """`defaults` updated with `params`, which must only hold known names."""
+    params = params or {}
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {name}: {sorted(unknown)}")
+    return {**defaults, **params}
+
+
+# Name under which `ModuleBot` passes its overrides to the module body
+_MERGE_PARAMS = "__stonks_merge_params__"
+
+
+def _compile_module(path: str) -> CodeType:
+    """Code object of a bot file, compiled again when the file changes."""
+    return _compile_version(path, os.stat(path).st_mtime_ns)
+
+
+@functools.cache
+def _compile_version(path: str, mtime_ns: int) -> CodeType:
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    # `PARAMS = {...}` at module level becomes `PARAMS = _MERGE_PARAMS({...})`
+    # so that the overrides are in place before the rest of the body runs
+    for node in tree.body:
+        if (
+            isinstance(node, (ast.Assign, ast.AnnAssign))
+            and node.value is not None
+            and any(
+                isinstance(t, ast.Name) and t.id == "PARAMS"
+                for t in (node.targets if isinstance(node, ast.Assign) else [node.target])
+            )
+        ):
+            node.value = ast.Call(ast.Name(_MERGE_PARAMS, ast.Load()), [node.value], [])
+    return compile(ast.fix_missing_locations(tree), path, "exec")
+
+
+class ModuleBot(Bot):
+    """
+    `Bot` running a module that exposes `make_decision` (and optionally
+    `make_decisions` and `PARAMS`), such as the phases' `bot_trade*.py`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the bot file. Its directory is put on `sys.path` so that the
+        bot can import its sibling helpers.
+    params : dict, optional
+        Overrides of the module's `PARAMS`. They are merged into the dict
+        when the module body assigns it, so module-level constants derived
+        from `PARAMS` see them too.
+
+    Attributes
+    ----------
+    module : ModuleType
+        The bot's current module object, replaced on every `reset`.
+    make_decisions : callable or None
+        The module's vectorized `make_decisions`, if it has one.
+    series : dict or None
+        Indicator series given with `provide_series`.
+    """
+
+    def __init__(self, path: str, params: dict[str, Any] | None = None):
+        self.path = os.path.abspath(path)
+        directory = os.path.dirname(self.path)
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        self._code = _compile_module(self.path)
+        self._overrides = params or {}
+        self.params = None
+        self.series = None
+        self.reset()
+
+    def reset(self):
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+        module = ModuleType(f"_stonks_{stem}")
+        module.__file__ = self.path
+        setattr(module, _MERGE_PARAMS, self._merge_params)
+        exec(self._code, module.__dict__)
+        delattr(module, _MERGE_PARAMS)
+
+        if self.params is None:
+            # No PARAMS in the module: only an empty set of overrides is valid
+            self._merge_params({})
+        if self.series is not None:
+            module.INDICATOR_SERIES = self.series
+        self.module = module
+        # Bound directly: no extra call layer per tick
+        self.on_tick = module.make_decision
+        self.make_decisions = getattr(module, "make_decisions", None)
+
+    def provide_series(self, series: dict[str, Any]):
+        """
+        Precomputed indicator series of the module's `INDICATORS`
+        declaration (`stonks.cache`), set as its `INDICATOR_SERIES` now and
+        after every reset.
+        """
+        self.series = series
+        self.module.INDICATOR_SERIES = series
+
+    def _merge_params(self, defaults: dict[str, Any]) -> dict[str, Any]:
+        params = merge_params(defaults, self._overrides, self.path)
+        if self.params is None:
+            self.params = dict(params)
+        return params if self._overrides else defaults
+
+    def on_tick(self, epoch: int, *asset_prices: float):
+        # Shadowed by the module's make_decision, bound on every reset
+        return self.module.make_decision(epoch, *asset_prices)
@@ -0,0 +1,196 @@
+"""
+On-disk cache of full indicator series.
+
+A sweep runs the same bot thousands of times over the same dataset, and
+each run recomputes the same EMA(20), RSI(14) or Bollinger(20, 2.0) series.
+`IndicatorCache` stores each series once as a `.npy` file named after the
+indicator, its parameters and a hash of the input values, and loads it back
+memory-mapped, so later runs (in any process, or in a later sweep) only map
+the file:
+
+    cache = IndicatorCache()
+    rsi = cache.indicator("rsi", prices, period=14)
+    sma, upper, lower = cache.indicator("bollinger", prices, period=20, std_dev=2.0).T
+    spread = cache.series("spread", my_spread, prices, period=10)
+
+A bot declares the series it reads in a module-level `INDICATORS` dict,
+`{key: (column, indicator, params)}`, which may be derived from its
+`PARAMS`. `stonks.sweep` resolves the declaration with `declared` for each
+grid point and hands the series to the bot as `INDICATOR_SERIES` (see
+`ModuleBot.provide_series` and phase2/bot_trade_v13_ladder.py), so only
+the first sweep over a dataset computes them.
+
+The directory is bounded in size: files are evicted least recently used
+first (every hit refreshes the file's mtime). Files are written to a
+temporary name and renamed, so concurrent workers never read a partial file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Mapping
+
+import numpy as np
+
+from stonks.indicators import bollinger_series, ema_series, roc_series, rsi_series
+
+DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), "stonks_cache")
+DEFAULT_MAX_BYTES = 1 << 30
+
+INDICATORS: dict[str, Callable[..., np.ndarray]] = {
+    "ema": ema_series,
+    "rsi": rsi_series,
+    "roc": roc_series,
+    "bollinger": bollinger_series,
+}
+
+
+def dataset_hash(values: np.ndarray) -> str:
+    """Content hash of an input series (values, dtype and shape)."""
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{values.dtype.str}{values.shape}".encode())
+    digest.update(values.data)
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Size-bounded directory of indicator series.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where series are stored, `$STONKS_CACHE_DIR` or a `stonks_cache`
+        folder in the temporary directory by default.
+    max_bytes : int
+        Total size above which the least recently used files are deleted.
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get("STONKS_CACHE_DIR", DEFAULT_DIRECTORY)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, dataset: str, name: str, params: dict[str, Any]) -> str:
+        key = json.dumps(params, sort_keys=True, default=str)
+        params_hash = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.directory, f"{name}-{params_hash}-{dataset}.npy")
+
+    def load(self, dataset: str, name: str, params: dict[str, Any]) -> np.ndarray | None:
+        """Read-only memory map of a cached series, or None."""
+        path = self.path(dataset, name, params)
+        try:
+            series = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError):
+            # Truncated or corrupt file: a miss, rebuilt by the caller
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            return None
+        return series
+
+    def store(self, dataset: str, name: str, params: dict[str, Any], series: np.ndarray):
+        path = self.path(dataset, name, params)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.asarray(series))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def series(
+        self,
+        name: str,
+        compute: Callable[..., np.ndarray],
+        values: np.ndarray,
+        dataset: str | None = None,
+        **params,
+    ) -> np.ndarray:
+        """
+        `compute(values, **params)`, from the cache when it was stored before.
+
+        `dataset` can be given as `dataset_hash(values)` to hash a long
+        series only once for several indicators.
+        """
+        dataset = dataset or dataset_hash(values)
+        series = self.load(dataset, name, params)
+        if series is not None:
+            self.hits += 1
+            return series
+
+        self.misses += 1
+        series = compute(values, **params)
+        self.store(dataset, name, params, series)
+        # Only missing if the series alone is larger than `max_bytes`
+        cached = self.load(dataset, name, params)
+        return series if cached is None else cached
+
+    def indicator(
+        self, name: str, values: np.ndarray, dataset: str | None = None, **params
+    ) -> np.ndarray:
+        """`series` of one of the built-in `INDICATORS`."""
+        return self.series(name, INDICATORS[name], values, dataset, **params)
+
+    def declared(
+        self,
+        indicators: dict[str, tuple[str, str, dict[str, Any]]],
+        columns: Mapping[str, np.ndarray],
+        datasets: dict[str, str] | None = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Series of a bot's `INDICATORS` declaration.
+
+        Parameters
+        ----------
+        indicators : dict
+            {key: (column, indicator name, params)}, the indicator being one
+            of `INDICATORS`.
+        columns : mapping
+            Input values of each column, e.g. a prices DataFrame.
+        datasets : dict, optional
+            `dataset_hash` of each column, to hash them only once.
+        """
+        datasets = datasets or {}
+        return {
+            key: self.indicator(
+                name, np.asarray(columns[column]), datasets.get(column), **params
+            )
+            for key, (column, name, params) in indicators.items()
+        }
+
+    def evict(self):
+        """Delete the least recently used files until the directory fits in `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                os.unlink(entry.path)
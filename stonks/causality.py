@@ -0,0 +1,187 @@
+"""
+Lookahead checks for bots with a vectorized `make_decisions`.
+
+`backtest` assumes that the position at epoch t only uses prices up to t;
+an off-by-one shift in a batch port silently breaks that. Two checks:
+
+- streaming vs batch: the weights of `make_decision` called epoch by epoch
+  (as main.py does) must equal the rows of `make_decisions` on the whole
+  series;
+- truncation: running the batch path on `prices[:cut]` must reproduce the
+  first `cut` rows of the full run. A decision that reads `h` epochs ahead
+  is caught by any cut falling less than `h` epochs after it.
+
+Cuts are spread over the series (every epoch with `--cuts 0`) and checked
+in a process pool, with the prices and the reference weights published
+once in shared memory:
+
+    python -m stonks.causality phase2/bot_trade.py phase2/data/asset_b_train.csv --cuts 512
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from stonks.bots import ModuleBot
+from stonks.phases import decide, load_module, load_prices, run_bot
+from stonks.shared_prices import SharedPrices, SharedPricesHandle, attach_prices
+
+# Per-worker state, set once by `_init_worker`
+_worker: dict[str, Any] = {}
+
+
+def first_mismatch(a: np.ndarray, b: np.ndarray, atol: float = 1e-9) -> int | None:
+    """Position of the first row where two weight matrices differ, if any."""
+    bad = ~np.isclose(a, b, rtol=0, atol=atol).all(axis=1)
+    return int(np.argmax(bad)) if bad.any() else None
+
+
+def check_streaming(bot_path: str, prices: pd.DataFrame, atol: float = 1e-9) -> dict[str, Any]:
+    """Compare `make_decision` run epoch by epoch with `make_decisions` on fresh bots."""
+    streaming = run_bot(load_module(bot_path).make_decision, prices)
+    batch = decide(load_module(bot_path), prices)
+    t = first_mismatch(streaming, batch, atol)
+    if t is None:
+        return {"ok": True}
+    return {
+        "ok": False,
+        "epoch": int(prices.index[t]),
+        "streaming": streaming[t].tolist(),
+        "batch": batch[t].tolist(),
+    }
+
+
+def choose_cuts(n_epochs: int, n_cuts: int = 256, seed: int = 0) -> np.ndarray:
+    """
+    Sorted prefix lengths to check: every one from 1 to `n_epochs - 1` when
+    `n_cuts` is 0 or covers them all, else `n_cuts` of them, the first
+    epochs plus evenly spread and random ones.
+    """
+    candidates = np.arange(1, n_epochs)
+    if not n_cuts or n_cuts >= len(candidates):
+        return candidates
+    rng = np.random.default_rng(seed)
+    n_fixed = n_cuts // 4
+    fixed = np.concatenate([
+        candidates[:n_fixed],
+        np.linspace(1, n_epochs - 1, n_fixed, dtype=np.int64),
+    ])
+    rest = np.setdiff1d(candidates, fixed)
+    drawn = rng.choice(rest, size=min(n_cuts - len(np.unique(fixed)), len(rest)), replace=False)
+    return np.unique(np.concatenate([fixed, drawn]))
+
+
+def _init_worker(
+    bot_path: str,
+    prices_handle: SharedPricesHandle,
+    weights_handle: SharedPricesHandle,
+    atol: float,
+):
+    _worker["bot"] = ModuleBot(bot_path)
+    _worker["prices"] = attach_prices(prices_handle)
+    _worker["weights"] = attach_prices(weights_handle).to_numpy()
+    _worker["atol"] = atol
+
+
+def check_cuts(cuts: np.ndarray) -> list[dict[str, Any]]:
+    """Rerun the batch path on each prefix and report prefixes that change."""
+    prices, reference, bot = _worker["prices"], _worker["weights"], _worker["bot"]
+    failures = []
+    for cut in cuts:
+        bot.reset()
+        weights = decide(bot, prices.iloc[:cut])
+        t = first_mismatch(weights, reference[:cut], _worker["atol"])
+        if t is not None:
+            failures.append({
+                "cut": int(cut),
+                "epoch": int(prices.index[t]),
+                "truncated": weights[t].tolist(),
+                "full": reference[t].tolist(),
+            })
+    return failures
+
+
+def check_truncation(
+    bot_path: str,
+    prices: pd.DataFrame,
+    n_cuts: int = 256,
+    seed: int = 0,
+    workers: int | None = None,
+    atol: float = 1e-9,
+) -> dict[str, Any]:
+    """
+    Truncation test of a bot's batch path over `choose_cuts` prefixes.
+
+    Returns
+    -------
+    dict
+        Contains:
+        - "n_cuts": number of prefixes checked
+        - "failures": one entry per prefix whose decisions differ from the
+          full run (cut, first differing epoch and both weight rows)
+    """
+    reference = decide(load_module(bot_path), prices)
+    cuts = choose_cuts(len(prices), n_cuts, seed)
+    workers = workers or os.cpu_count() or 1
+    # Interleaved chunks, so that every worker gets short and long prefixes
+    chunks = [cuts[i::workers * 4] for i in range(min(len(cuts), workers * 4))]
+
+    reference = pd.DataFrame(reference, index=prices.index, columns=prices.columns)
+    with (
+        SharedPrices(prices) as shared_prices,
+        SharedPrices(reference) as shared_weights,
+        ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                os.path.abspath(bot_path), shared_prices.handle, shared_weights.handle, atol,
+            ),
+        ) as executor,
+    ):
+        failures = [f for chunk in executor.map(check_cuts, chunks) for f in chunk]
+
+    return {"n_cuts": len(cuts), "failures": sorted(failures, key=lambda f: f["epoch"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("bot", help="bot module exposing make_decision and make_decisions")
+    parser.add_argument("csv", help="price CSV")
+    parser.add_argument("--cuts", type=int, default=256, help="prefixes to check (0: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--atol", type=float, default=1e-9)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    bot = load_module(args.bot)
+    if not hasattr(bot, "make_decisions"):
+        sys.exit(f"{args.bot} has no make_decisions: nothing to check")
+    prices = load_prices(args.csv)
+
+    streaming = check_streaming(args.bot, prices, args.atol)
+    if streaming["ok"]:
+        print("streaming vs batch: identical weights")
+    else:
+        print(
+            f"streaming vs batch: first difference at epoch {streaming['epoch']}:"
+            f" {streaming['streaming']} vs {streaming['batch']}"
+        )
+
+    truncation = check_truncation(
+        args.bot, prices, args.cuts, args.seed, args.workers, args.atol
+    )
+    failures = truncation["failures"]
+    print(f"truncation: {truncation['n_cuts']} prefixes, {len(failures)} changed a past decision")
+    for f in failures[:10]:
+        print(f"  prefix of {f['cut']} epochs changes epoch {f['epoch']}: {f['truncated']} vs {f['full']}")
+
+    sys.exit(0 if streaming["ok"] and not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Binary cache of price CSVs.
+
+Parsing a price CSV is most of the cost of loading it: a million-epoch
+dataset from `stonks.generate` takes seconds to read as text. The first
+time a CSV is loaded, `DatasetCache` writes its prices as a float64 `.npy`
+(with the Cash column already appended), the epochs as a second `.npy` and
+the columns and source signature as JSON. Later loads memory-map both
+arrays read-only, with no parsing and no copy:
+
+    epochs, columns, values = load_dataset("phase3/data/asset_a_b_train.csv")
+
+An entry is reused while the CSV keeps its size and modification time; if
+only the mtime changed (a checkout, a copy), the file is re-hashed and the
+entry kept when the content is the same, otherwise it is rebuilt. Files are
+written under a temporary name and renamed, metadata last, so a reader
+never sees a partial entry. The cache lives in the `datasets` folder of
+`$STONKS_CACHE_DIR` (the temporary directory by default); when it cannot
+be written, the parsed arrays are returned as is.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from stonks.arrays import load_price_arrays
+
+DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), "stonks_cache")
+HASH_CHUNK = 1 << 20
+
+
+def file_hash(path: str) -> str:
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class DatasetCache:
+    """
+    Directory of price CSVs converted to memory-mappable arrays.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Where entries are stored, the `datasets` folder of
+        `$STONKS_CACHE_DIR` or of a `stonks_cache` folder in the temporary
+        directory by default.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or os.path.join(
+            os.environ.get("STONKS_CACHE_DIR", DEFAULT_DIRECTORY), "datasets"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def paths(self, path_csv: str) -> dict[str, str]:
+        """Files of the entry of a CSV: "values", "epochs" and "meta"."""
+        path_csv = os.path.abspath(path_csv)
+        key = hashlib.blake2b(path_csv.encode(), digest_size=8).hexdigest()
+        stem = f"{os.path.splitext(os.path.basename(path_csv))[0]}-{key}"
+        return {
+            "values": os.path.join(self.directory, f"{stem}.npy"),
+            "epochs": os.path.join(self.directory, f"{stem}.epochs.npy"),
+            "meta": os.path.join(self.directory, f"{stem}.json"),
+        }
+
+    def entry(self, path_csv: str, stat: os.stat_result | None = None) -> dict | None:
+        """Metadata of the entry of a CSV if it matches the file, else None."""
+        stat = stat or os.stat(path_csv)
+        path_meta = self.paths(path_csv)["meta"]
+        try:
+            with open(path_meta) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if meta["size"] != stat.st_size:
+            return None
+        if meta["mtime_ns"] != stat.st_mtime_ns:
+            if meta["hash"] != file_hash(path_csv):
+                return None
+            meta["mtime_ns"] = stat.st_mtime_ns
+            try:
+                self._write_meta(path_meta, meta)
+            except OSError:
+                pass
+        return meta
+
+    def load(self, path_csv: str) -> tuple[np.ndarray, list[str], np.ndarray]:
+        """
+        `load_price_arrays` of a CSV, memory-mapped from the cache when the
+        entry matches the file.
+        """
+        stat = os.stat(path_csv)
+        meta = self.entry(path_csv, stat)
+        if meta is not None:
+            paths = self.paths(path_csv)
+            try:
+                epochs = np.load(paths["epochs"], mmap_mode="r")
+                values = np.load(paths["values"], mmap_mode="r")
+            except (OSError, ValueError):
+                pass
+            else:
+                self.hits += 1
+                return epochs, meta["columns"], values
+
+        self.misses += 1
+        epochs, columns, values = load_price_arrays(path_csv)
+        try:
+            self.store(path_csv, stat, epochs, columns, values)
+        except OSError:
+            pass
+        return epochs, columns, values
+
+    def store(
+        self,
+        path_csv: str,
+        stat: os.stat_result,
+        epochs: np.ndarray,
+        columns: list[str],
+        values: np.ndarray,
+    ):
+        os.makedirs(self.directory, exist_ok=True)
+        paths = self.paths(path_csv)
+        _write_atomic(paths["values"], lambda f: np.save(f, values))
+        _write_atomic(paths["epochs"], lambda f: np.save(f, epochs))
+        self._write_meta(paths["meta"], {
+            "source": os.path.abspath(path_csv),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_hash(path_csv),
+            "columns": columns,
+        })
+
+    def _write_meta(self, path: str, meta: dict):
+        _write_atomic(path, lambda f: f.write(json.dumps(meta).encode()))
+
+
+def load_dataset(path_csv: str) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """`load_price_arrays` through the default `DatasetCache`."""
+    if not os.path.exists(path_csv):
+        raise FileNotFoundError(f"Le fichier CSV {path_csv} n'existe pas")
+    return DatasetCache().load(path_csv)
@@ -0,0 +1,214 @@
+"""
+Synthetic price datasets in the `,Asset A,Asset B` CSV layout of main.py.
+
+Log returns are `drift + noise + crash shocks`, where the noise is an AR(1)
+process with the requested autocorrelation and stationary volatility, and
+crashes are market-wide drops of `crash_size` spread over `crash_length`
+epochs, starting at random with probability `crash_rate` per epoch. Series
+are generated (and written) chunk by chunk, so 10^7 epochs fit in bounded
+memory, and everything is driven by one seed:
+
+    python -m stonks.generate data/synthetic_1m.csv --epochs 1000000 --assets 2 \\
+        --drift 0.0003 --volatility 0.005 --autocorrelation 0.35 --crash-rate 0.0002
+"""
+
+import argparse
+import math
+import string
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 1_000_000
+
+
+def asset_names(n_assets: int) -> list[str]:
+    """'Asset A', 'Asset B', ... as in the bundled CSVs."""
+    if not 1 <= n_assets <= len(string.ascii_uppercase):
+        raise ValueError(f"n_assets must be between 1 and 26, got {n_assets}")
+    return [f"Asset {letter}" for letter in string.ascii_uppercase[:n_assets]]
+
+
+def _ar1(eps: np.ndarray, phi: float, r_prev: np.ndarray) -> np.ndarray:
+    """
+    `r[t] = phi * r[t-1] + eps[t]` along axis 0, starting from `r_prev`.
+
+    Within blocks short enough for `phi ** -block` not to overflow, the
+    recurrence is the scaled cumulative sum `phi^t * cumsum(eps[s] / phi^s)`;
+    only the carry between blocks is propagated sequentially.
+    """
+    if phi == 0:
+        return eps.copy()
+
+    n, n_assets = eps.shape
+    block = int(min(4096, max(1, 250 / -math.log10(abs(phi)))))
+    powers = phi ** np.arange(block + 1)
+
+    pad = -n % block
+    blocks = np.concatenate([eps, np.zeros((pad, n_assets))]).reshape(-1, block, n_assets)
+    local = powers[None, :-1, None] * np.cumsum(
+        blocks / powers[None, :-1, None], axis=1
+    )
+
+    carry = np.empty((len(blocks), n_assets))
+    c = r_prev
+    for i, last in enumerate(local[:, -1]):
+        carry[i] = c
+        c = last + powers[-1] * c
+
+    r = local + powers[None, 1:, None] * carry[:, None, :]
+    return r.reshape(-1, n_assets)[:n]
+
+
+class PriceGenerator:
+    """
+    Stateful generator of consecutive price chunks.
+
+    Parameters
+    ----------
+    n_assets : int
+        Number of assets, named 'Asset A', 'Asset B', ...
+    drift, volatility : float or sequence of float
+        Mean and stationary standard deviation of the per-epoch log returns,
+        one value for all assets or one per asset.
+    autocorrelation : float
+        Lag-1 autocorrelation of the returns' noise, in (-1, 1).
+    crash_rate : float
+        Probability that a crash starts at a given epoch.
+    crash_size : float
+        Fraction of value lost over one crash (e.g. 0.2 for -20%).
+    crash_length : int
+        Number of epochs a crash is spread over.
+    start_prices : float or sequence of float
+        Prices at epoch 0.
+    seed : int, optional
+        Seed of the random generators; the output does not depend on how
+        the series is split into chunks.
+    columns : list of str, optional
+        Asset names, overriding `n_assets` (e.g. ['Asset B'] for phase2).
+    """
+
+    def __init__(
+        self,
+        n_assets: int = 1,
+        drift: float | list[float] = 0.0,
+        volatility: float | list[float] = 0.005,
+        autocorrelation: float = 0.0,
+        crash_rate: float = 0.0,
+        crash_size: float = 0.2,
+        crash_length: int = 5,
+        start_prices: float | list[float] = 1.0,
+        seed: int | None = None,
+        columns: list[str] | None = None,
+    ):
+        if not -1 < autocorrelation < 1:
+            raise ValueError(f"autocorrelation must be in (-1, 1), got {autocorrelation}")
+        if not 0 <= crash_size < 1 or crash_length < 1:
+            raise ValueError("crash_size must be in [0, 1) and crash_length >= 1")
+
+        if columns is not None:
+            n_assets = len(columns)
+        self.columns = list(columns) if columns is not None else asset_names(n_assets)
+        self.drift = np.broadcast_to(np.asarray(drift, dtype=np.float64), (n_assets,))
+        volatility = np.broadcast_to(np.asarray(volatility, dtype=np.float64), (n_assets,))
+        self.noise_std = volatility * math.sqrt(1 - autocorrelation**2)
+        self.autocorrelation = autocorrelation
+        self.crash_rate = crash_rate
+        self.crash_kernel = np.full(crash_length, math.log(1 - crash_size) / crash_length)
+        noise_seed, crash_seed = np.random.SeedSequence(seed).spawn(2)
+        self._noise_rng = np.random.default_rng(noise_seed)
+        self._crash_rng = np.random.default_rng(crash_seed)
+
+        self.n_epochs = 0
+        self.start_prices = np.broadcast_to(
+            np.asarray(start_prices, dtype=np.float64), (n_assets,)
+        )
+        self._log_growth = np.zeros(n_assets)
+        self._noise = np.zeros(n_assets)
+        self._pending_crash = np.zeros(crash_length - 1)
+
+    def next_chunk(self, n: int) -> pd.DataFrame:
+        """The next `n` epochs, indexed by epoch number."""
+        eps = self._noise_rng.standard_normal((n, len(self.columns))) * self.noise_std
+        noise = _ar1(eps, self.autocorrelation, self._noise)
+        self._noise = noise[-1]
+
+        crashes = np.zeros(n + len(self._pending_crash))
+        if self.crash_rate > 0:
+            starts = (self._crash_rng.random(n) < self.crash_rate).astype(np.float64)
+            crashes += np.convolve(starts, self.crash_kernel)
+        crashes[: len(self._pending_crash)] += self._pending_crash
+        self._pending_crash = crashes[n:]
+
+        log_returns = self.drift + noise + crashes[:n, None]
+        if self.n_epochs == 0:
+            # Epoch 0 sits exactly at the start prices
+            log_returns[0] = 0.0
+        log_growth = self._log_growth + np.cumsum(log_returns, axis=0)
+        self._log_growth = log_growth[-1]
+
+        index = pd.RangeIndex(self.n_epochs, self.n_epochs + n)
+        self.n_epochs += n
+        prices = self.start_prices * np.exp(log_growth)
+        return pd.DataFrame(prices, index=index, columns=self.columns)
+
+
+def generate(n_epochs: int, chunk_size: int = CHUNK_SIZE, **params) -> pd.DataFrame:
+    """Whole synthetic series in memory; `params` go to `PriceGenerator`."""
+    generator = PriceGenerator(**params)
+    chunks = []
+    while generator.n_epochs < n_epochs:
+        chunks.append(generator.next_chunk(min(chunk_size, n_epochs - generator.n_epochs)))
+    return pd.concat(chunks)
+
+
+def _csv_rows(start: int, values: np.ndarray) -> str:
+    """`epoch,price,...` lines with round-trip float reprs, ~3x faster than `to_csv`."""
+    columns = (map(repr, column) for column in values.T.tolist())
+    epochs = map(str, range(start, start + len(values)))
+    return "\n".join(map(",".join, zip(epochs, *columns))) + "\n"
+
+
+def write_csv(path: str, n_epochs: int, chunk_size: int = CHUNK_SIZE, **params):
+    """Write a synthetic series to `path` chunk by chunk."""
+    generator = PriceGenerator(**params)
+    with open(path, "w", newline="") as f:
+        f.write(",".join(["", *generator.columns]) + "\n")
+        while generator.n_epochs < n_epochs:
+            start = generator.n_epochs
+            chunk = generator.next_chunk(min(chunk_size, n_epochs - start))
+            f.write(_csv_rows(start, chunk.to_numpy()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--epochs", type=int, default=2_520)
+    parser.add_argument("--assets", type=int, default=1)
+    parser.add_argument("--drift", type=float, nargs="+", default=[0.0])
+    parser.add_argument("--volatility", type=float, nargs="+", default=[0.005])
+    parser.add_argument("--autocorrelation", type=float, default=0.0)
+    parser.add_argument("--crash-rate", type=float, default=0.0)
+    parser.add_argument("--crash-size", type=float, default=0.2)
+    parser.add_argument("--crash-length", type=int, default=5)
+    parser.add_argument("--start", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_csv(
+        args.output,
+        args.epochs,
+        n_assets=args.assets,
+        drift=args.drift,
+        volatility=args.volatility,
+        autocorrelation=args.autocorrelation,
+        crash_rate=args.crash_rate,
+        crash_size=args.crash_size,
+        crash_length=args.crash_length,
+        start_prices=args.start,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Fixed-capacity price history for bots.
+
+The bots keep every price in a module-level list and slice it on each tick
+(`price_history[-21:]`, `price_history[:-6]`), which copies the slice and
+lets memory grow with the length of the run. `RingBuffer` holds only the
+last `capacity` values, in a NumPy array allocated once, and hands out
+windows as views with no copy:
+
+    history = RingBuffer(40)            # largest lookback of the bot
+
+    def make_decision(epoch, price):
+        history.append(price)
+        if history.count >= 40:
+            recent = history.last(21)           # price_history[-21:]
+            past = history.last(16, lag=6)      # price_history[:-6][-16:]
+            returns = np.diff(recent) / recent[:-1]
+            ...
+
+Every value is written twice, at `i` and `i + capacity` of a buffer of
+`2 * capacity`, so the last `n <= capacity` values are always contiguous.
+Views are read-only and stay valid for `capacity - n` further appends;
+copy them to keep them longer.
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Last `capacity` values of a series, with zero-copy window views.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of values kept, i.e. the largest lookback (plus lag) needed.
+    width : int, optional
+        Values per tick; when given, each value is a row of `width` floats
+        (e.g. one price per asset) and windows have shape (n, width).
+    dtype : numpy dtype
+        Type of the stored values.
+    """
+
+    __slots__ = ("capacity", "count", "_buffer", "_readonly", "_position")
+
+    def __init__(self, capacity: int, width: int | None = None, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        shape = (2 * capacity,) if width is None else (2 * capacity, width)
+        self.capacity = capacity
+        self.count = 0
+        self._buffer = np.zeros(shape, dtype=dtype)
+        # Windows are sliced from a read-only alias of the same memory
+        self._readonly = self._buffer.view()
+        self._readonly.flags.writeable = False
+        self._position = capacity - 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, value):
+        """Add one value (or one row), overwriting the oldest one when full."""
+        position = self._position + 1
+        if position == 2 * self.capacity:
+            position = self.capacity
+        self._buffer[position] = value
+        self._buffer[position - self.capacity] = value
+        self._position = position
+        self.count += 1
+
+    def last(self, n: int | None = None, lag: int = 0) -> np.ndarray:
+        """
+        Read-only view of the `n` values (all of them by default) ending
+        `lag` ticks before the latest one: `values[:len - lag][-n:]`.
+        """
+        size = min(self.count, self.capacity) - lag
+        n = size if n is None else min(n, size)
+        if n < 0 or lag < 0:
+            raise IndexError(f"Window of {n} values with lag {lag} out of a history of {len(self)}")
+        end = self._position + 1 - lag
+        return self._readonly[end - n:end]
+
+    def __getitem__(self, index: int):
+        """Single value by position, e.g. `history[-1]` for the latest one."""
+        size = len(self)
+        if not -size <= index < size:
+            raise IndexError(f"Index {index} out of a history of {size}")
+        if index >= 0:
+            index -= size
+        return self._readonly[self._position + 1 + index]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        values = self.last()
+        return values.astype(dtype, copy=True) if dtype is not None or copy else values
+
+    def clear(self):
+        self.count = 0
+        self._position = self.capacity - 1
@@ -0,0 +1,464 @@
+"""
+Streaming indicators updated in O(1) per tick.
+
+Each indicator is fed one value per epoch with `update`, which returns the
+current value (also kept in `.value`). They reproduce the `calculate_*`
+helpers of the bots, which recompute everything from the full price
+history on every tick, so a bot can keep a few indicator objects instead
+of its `price_history`. An EMA helper called on a slice such as
+`prices[-30:]` restarts on every tick and has no O(1) equivalent; `EMA`
+only matches EMA helpers run on the whole history:
+
+    ema_8 = EMA(8, warmup="mean")       # calculate_ema of bot_trade_v6_ema.py
+    rsi = RSI(14)                       # calculate_rsi
+    bands = RollingMeanStd(20)          # calculate_bb: mean ± 2 * std
+    mom_8 = ROC(8)                      # calculate_momentum(prices, 8)
+    volatility = ReturnsVolatility(20)  # np.std of the last 20 returns
+
+    def make_decision(epoch, price):
+        ema_8.update(price)
+        ...
+
+Rolling windows behave like the helpers' `prices[-period:]` slices: until
+`period` values have been seen they cover everything seen so far, and
+`ready` tells when the window is full. Results agree with the helpers up
+to floating-point rounding (~1e-12 relative). `RollingTrend`'s slope and
+correlation cross zero, where a relative bound means nothing: the
+correlation is within ~1e-13 of `np.corrcoef` in absolute terms (~1e-12
+relative once it is above 0.1 in magnitude), `trend_series` within ~1e-15.
+
+`ema_series`, `rsi_series`, `roc_series`, `bollinger_series` and
+`trend_series` compute the same values for a whole series at once, one row
+per epoch, for batch bots and for `stonks.cache`.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class EMA:
+    """
+    Exponential moving average seeded with the first value, as `calculate_ema`.
+
+    Parameters
+    ----------
+    period : int
+        Smoothing period, `alpha = 2 / (period + 1)`.
+    warmup : {"last", "mean"}
+        Value returned before `period` values were seen: the last value
+        (the rule of phase2/bot_trade.py's `calculate_ema`) or the mean of
+        the values so far (bot_trade_v6_ema.py). With "mean" the EMA matches
+        bot_trade_v6_ema.py, which smooths its whole history. phase2/bot_trade.py
+        only applies its helper to the last 30 or 60 prices, which restarts
+        the average every tick; a recursive EMA cannot reproduce that, so
+        "last" matches the helper on the full history, not that bot.
+    """
+
+    def __init__(self, period: int, warmup: str = "last"):
+        if warmup not in ("last", "mean"):
+            raise ValueError(f"warmup must be 'last' or 'mean', got {warmup!r}")
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.warmup = warmup
+        self.n = 0
+        self.ema = 0.0
+        self._sum = 0.0
+        self.value = math.nan
+
+    @property
+    def ready(self) -> bool:
+        return self.n >= self.period
+
+    def update(self, x: float) -> float:
+        self.n += 1
+        self.ema = x if self.n == 1 else (x - self.ema) * self.alpha + self.ema
+        if self.ready:
+            self.value = self.ema
+        elif self.warmup == "mean":
+            self._sum += x
+            self.value = self._sum / self.n
+        else:
+            self.value = x
+        return self.value
+
+
+class RollingSum:
+    """
+    Sum of the last `window` values.
+
+    The running sum is rebuilt from the window every `resync` updates so
+    that rounding errors cannot accumulate over millions of ticks (amortized
+    O(1)); it is exactly 0 whenever the window only holds zeros.
+    """
+
+    def __init__(self, window: int, resync: int = 100_000):
+        self.window = window
+        self.resync = max(resync, window)
+        self.values = deque(maxlen=window)
+        self.sum = 0.0
+        self.nonzero = 0
+        self._since_resync = 0
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.sum -= old
+            self.nonzero -= old != 0
+        self.values.append(x)
+        self.sum += x
+        self.nonzero += x != 0
+
+        self._since_resync += 1
+        if not self.nonzero:
+            self.sum = 0.0
+        elif self._since_resync >= self.resync:
+            self.sum = math.fsum(self.values)
+            self._since_resync = 0
+        return self.sum
+
+
+class RSI:
+    """
+    Relative strength index over the last `period` price changes.
+
+    `method="sma"` averages gains and losses over the window, as the bots'
+    `calculate_rsi` (50 until `period + 1` prices were seen, 100 without
+    any loss in the window). `method="wilder"` uses Wilder's smoothing
+    `avg = (avg * (period - 1) + x) / period`, seeded with the SMA of the
+    first `period` changes.
+    """
+
+    def __init__(self, period: int = 14, method: str = "sma"):
+        if method not in ("sma", "wilder"):
+            raise ValueError(f"method must be 'sma' or 'wilder', got {method!r}")
+        self.period = period
+        self.method = method
+        self.n = 0
+        self.last = math.nan
+        self.gains = RollingSum(period)
+        self.losses = RollingSum(period)
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value = 50.0
+
+    @property
+    def ready(self) -> bool:
+        return self.n > self.period
+
+    def update(self, price: float) -> float:
+        self.n += 1
+        if self.n > 1:
+            delta = price - self.last
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            if self.method == "sma" or self.n <= self.period + 1:
+                self.avg_gain = self.gains.update(gain) / self.period
+                self.avg_loss = self.losses.update(loss) / self.period
+            else:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        self.last = price
+
+        if not self.ready:
+            self.value = 50.0
+        elif self.avg_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        return self.value
+
+
+class RollingMeanStd:
+    """
+    Mean and population standard deviation (`np.std`) of the last `window`
+    values, with Welford's add/remove updates.
+
+    The moments are recomputed from the window every `resync` updates to
+    bound the drift of the sliding updates (amortized O(1)).
+    """
+
+    def __init__(self, window: int, resync: int = 100_000):
+        self.window = window
+        self.resync = max(resync, window)
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._since_resync = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.m2, 0.0) / len(self.values)) if self.values else 0.0
+
+    def update(self, x: float) -> tuple[float, float]:
+        """Add `x` and return `(mean, std)`."""
+        if self.ready:
+            old = self.values[0]
+            self.values.append(x)
+            mean = self.mean + (x - old) / self.window
+            self.m2 += (x - old) * (x - mean + old - self.mean)
+            self.mean = mean
+        else:
+            self.values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (x - self.mean)
+
+        self._since_resync += 1
+        if self._since_resync >= self.resync:
+            self.mean = math.fsum(self.values) / len(self.values)
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+            self._since_resync = 0
+        return self.mean, self.std
+
+
+class RollingMinMax:
+    """Minimum and maximum of the last `window` values (monotonic deques)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.n = 0
+        self._min = deque()  # (index, value), increasing values
+        self._max = deque()  # (index, value), decreasing values
+
+    @property
+    def ready(self) -> bool:
+        return self.n >= self.window
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1]
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1]
+
+    def update(self, x: float) -> tuple[float, float]:
+        """Add `x` and return `(min, max)`."""
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._min.append((self.n, x))
+        self._max.append((self.n, x))
+
+        first = self.n - self.window + 1
+        if self._min[0][0] < first:
+            self._min.popleft()
+        if self._max[0][0] < first:
+            self._max.popleft()
+        self.n += 1
+        return self.min, self.max
+
+
+class ROC:
+    """
+    Rate of change `(p[-1] - p[-period]) / p[-period]`, as `calculate_momentum`.
+
+    Note that `p[-period]` is `period - 1` ticks back; the value is 0 until
+    `period` prices were seen.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.value = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.period
+
+    def update(self, price: float) -> float:
+        self.values.append(price)
+        if self.ready:
+            self.value = (price - self.values[0]) / self.values[0]
+        return self.value
+
+
+class ReturnsVolatility:
+    """
+    Population standard deviation of the last `window` simple returns, i.e.
+    `np.std(np.diff(p[-window-1:]) / p[-window-1:-1])`; 0 before two prices.
+    """
+
+    def __init__(self, window: int = 20, resync: int = 100_000):
+        self.last = math.nan
+        self.returns = RollingMeanStd(window, resync)
+        self.value = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.returns.ready
+
+    def update(self, price: float) -> float:
+        if not math.isnan(self.last):
+            self.value = self.returns.update((price - self.last) / self.last)[1]
+        self.last = price
+        return self.value
+
+
+class RollingTrend:
+    """
+    Trend quality of the last `window` values against time 0..window-1:
+    least-squares slope, correlation with time (`np.corrcoef(x, recent)`,
+    as `calculate_trend_strength`) and fraction of up moves (the
+    consistency of `calculate_momentum_quality`). All three are 0 until the
+    window is full; the correlation is NaN on a flat window, as corrcoef.
+
+    The sums are kept relative to an anchor, the first value of the window,
+    so that the variance does not cancel out on high price levels. They are
+    rebuilt from the window, re-anchored, every `resync` updates (every
+    `window` updates by default, amortized O(1)): a stale anchor far from
+    the current prices costs digits.
+    """
+
+    def __init__(self, window: int = 20, resync: int | None = None):
+        if window < 2:
+            raise ValueError(f"window must be at least 2, got {window}")
+        self.window = window
+        self.resync = max(resync or window, window)
+        self.values = deque(maxlen=window)
+        self.sum_x = window * (window - 1) / 2
+        self.sxx = window * (window**2 - 1) / 12  # n * var(x)
+        self.anchor = 0.0
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+        self.sum_xy = 0.0
+        self.up_moves = 0
+        self.flat_moves = 0
+        self.slope = 0.0
+        self.correlation = 0.0
+        self.up_fraction = 0.0
+        self._since_resync = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    def _resync(self):
+        self.anchor = self.values[0]
+        y = [v - self.anchor for v in self.values]
+        self.sum_y = math.fsum(y)
+        self.sum_y2 = math.fsum(v * v for v in y)
+        self.sum_xy = math.fsum(i * v for i, v in enumerate(y))
+        self._since_resync = 0
+
+    def update(self, x: float) -> tuple[float, float, float]:
+        """Add `x` and return `(slope, correlation, up_fraction)`."""
+        if self.values:
+            move = x - self.values[-1]
+            self.up_moves += move > 0
+            self.flat_moves += move == 0
+        if self.ready:
+            old = self.values[0]
+            move = self.values[1] - old
+            self.up_moves -= move > 0
+            self.flat_moves -= move == 0
+            y_old, y = old - self.anchor, x - self.anchor
+            self.sum_xy += (self.window - 1) * y - (self.sum_y - y_old)
+            self.sum_y += y - y_old
+            self.sum_y2 += y * y - y_old * y_old
+            self.values.append(x)
+            self._since_resync += 1
+            if self._since_resync >= self.resync:
+                self._resync()
+        else:
+            self.values.append(x)
+            if self.ready:
+                self._resync()
+
+        if self.ready:
+            n = self.window
+            mean_y = self.sum_y / n
+            sxy = self.sum_xy - self.sum_x * mean_y
+            syy = self.sum_y2 - self.sum_y * mean_y
+            self.slope = sxy / self.sxx
+            if self.flat_moves == n - 1 or syy <= 0:
+                self.correlation = math.nan
+            else:
+                self.correlation = max(-1.0, min(1.0, sxy / math.sqrt(self.sxx * syy)))
+            self.up_fraction = self.up_moves / (n - 1)
+        return self.slope, self.correlation, self.up_fraction
+
+
+def ema_series(prices: np.ndarray, period: int, warmup: str = "last") -> np.ndarray:
+    """Value of `EMA(period, warmup)` after each price."""
+    ema = EMA(period, warmup)
+    return np.fromiter(map(ema.update, np.asarray(prices, dtype=np.float64).tolist()), np.float64)
+
+
+def rsi_series(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Value of `RSI(period)` (SMA method) after each price."""
+    prices = np.asarray(prices, dtype=np.float64)
+    rsi = np.full(len(prices), 50.0)
+    if len(prices) <= period:
+        return rsi
+
+    deltas = np.diff(prices)
+    avg_gain = sliding_window_view(np.where(deltas > 0, deltas, 0), period).mean(axis=1)
+    avg_loss = sliding_window_view(np.where(deltas < 0, -deltas, 0), period).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi[period:] = np.where(avg_loss == 0, 100, 100 - 100 / (1 + avg_gain / avg_loss))
+    return rsi
+
+
+def roc_series(prices: np.ndarray, period: int) -> np.ndarray:
+    """Value of `ROC(period)` after each price."""
+    prices = np.asarray(prices, dtype=np.float64)
+    roc = np.zeros(len(prices))
+    if len(prices) >= period:
+        past = prices[: len(prices) - period + 1]
+        roc[period - 1:] = (prices[period - 1:] - past) / past
+    return roc
+
+
+def bollinger_series(prices: np.ndarray, period: int = 20, std_dev: float = 2.0) -> np.ndarray:
+    """
+    `(sma, upper, lower)` rows of `calculate_bb` after each price, shape (T, 3);
+    the price itself three times until `period` prices were seen.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    bands = np.repeat(prices[:, None], 3, axis=1)
+    if len(prices) < period:
+        return bands
+
+    windows = sliding_window_view(prices, period)
+    sma, std = windows.mean(axis=1), windows.std(axis=1)
+    bands[period - 1:] = np.column_stack([sma, sma + std_dev * std, sma - std_dev * std])
+    return bands
+
+
+def trend_series(prices: np.ndarray, window: int = 20) -> np.ndarray:
+    """`(slope, correlation, up_fraction)` of `RollingTrend(window)` after each price, shape (T, 3)."""
+    prices = np.asarray(prices, dtype=np.float64)
+    trend = np.zeros((len(prices), 3))
+    if len(prices) < window:
+        return trend
+
+    x = np.arange(window) - (window - 1) / 2
+    windows = sliding_window_view(prices, window)
+    # Relative to each window's first value, as the anchor of RollingTrend
+    sxy = (windows - windows[:, :1]) @ x
+    sxx = x @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = sxy / np.sqrt(sxx * window * windows.var(axis=1))
+
+    # Up and flat moves per window, from running counts
+    moves = np.diff(prices)
+    up_moves = np.concatenate([[0], np.cumsum(moves > 0)])
+    flat_moves = np.concatenate([[0], np.cumsum(moves == 0)])
+    up_moves = up_moves[window - 1:] - up_moves[: len(prices) - window + 1]
+    flat_moves = flat_moves[window - 1:] - flat_moves[: len(prices) - window + 1]
+    correlation[flat_moves == window - 1] = np.nan
+
+    trend[window - 1:] = np.column_stack([
+        sxy / sxx,
+        np.clip(correlation, -1.0, 1.0),
+        up_moves / (window - 1),
+    ])
+    return trend
@@ -0,0 +1,220 @@
+"""
+Monte Carlo robustness scoring on block-bootstrapped price paths.
+
+Paths are rebuilt from the dataset's own returns: blocks of consecutive
+epochs (all assets together, so their cross-correlation is kept) are drawn
+with replacement and chained from the first observed prices. A block of 1
+is a plain i.i.d. bootstrap. Paths are generated and backtested as arrays,
+chunk by chunk, in a process pool; the bot runs once per path, reset in
+between. The output is the distribution of Sharpe, max drawdown and base
+score:
+
+    python -m stonks.montecarlo phase2/bot_trade_v12_fine_tuned.py phase2/data/asset_b_train.csv \\
+        --paths 2000 --block 20
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from stonks.bots import ModuleBot
+from stonks.engine import backtest_arrays
+from stonks.phases import decide, load_prices
+from stonks.profiles import profile_for
+from stonks.shared_prices import SharedPrices, SharedPricesHandle, attach_prices
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Per-worker state, set once by `_init_worker`
+_worker: dict[str, Any] = {}
+
+
+def bootstrap_paths(
+    prices: np.ndarray,
+    n_paths: int,
+    block_size: int = 1,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """
+    Moving-block bootstrap of a price matrix.
+
+    Parameters
+    ----------
+    prices : np.ndarray
+        Observed prices of shape (T, n_columns), all strictly positive.
+    n_paths : int
+        Number of paths to draw.
+    block_size : int
+        Length of the blocks of consecutive returns (1 for i.i.d. draws).
+    rng : np.random.Generator, optional
+        Source of randomness.
+
+    Returns
+    -------
+    np.ndarray
+        Paths of shape (n_paths, T, n_columns) starting at `prices[0]`.
+    """
+    rng = rng or np.random.default_rng()
+    growth = prices[1:] / prices[:-1]
+    n_steps = len(growth)
+    if not 1 <= block_size <= n_steps:
+        raise ValueError(f"block_size must be between 1 and {n_steps}, got {block_size}")
+
+    n_blocks = -(-n_steps // block_size)
+    starts = rng.integers(0, n_steps - block_size + 1, size=(n_paths, n_blocks))
+    steps = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n_steps]
+
+    paths = np.empty((n_paths, len(prices), prices.shape[1]))
+    paths[:, 0] = prices[0]
+    np.cumprod(growth[steps], axis=1, out=paths[:, 1:])
+    paths[:, 1:] *= prices[0]
+    return paths
+
+
+def _init_worker(
+    bot_path: str,
+    prices_handle: SharedPricesHandle,
+    block_size: int,
+    initial_capital: float,
+):
+    _worker["bot"] = ModuleBot(bot_path)
+    _worker["prices"] = attach_prices(prices_handle)
+    _worker["profile"] = profile_for(bot_path)
+    _worker["block_size"] = block_size
+    _worker["initial_capital"] = initial_capital
+
+
+def evaluate_chunk(task: tuple[int, np.random.SeedSequence]) -> dict[str, np.ndarray]:
+    """Draw `n_paths` paths, run the bot on each and backtest them together."""
+    n_paths, seed = task
+    prices = _worker["prices"]
+    profile = _worker["profile"]
+    initial_capital = _worker["initial_capital"]
+
+    paths = bootstrap_paths(
+        prices.to_numpy(), n_paths, _worker["block_size"], np.random.default_rng(seed)
+    )
+    weights = np.empty_like(paths)
+    bot = _worker["bot"]
+    for k, path in enumerate(paths):
+        bot.reset()
+        path_prices = pd.DataFrame(path, index=prices.index, columns=prices.columns)
+        weights[k] = decide(bot, path_prices)
+
+    stats = backtest_arrays(
+        paths,
+        weights,
+        initial_capital=initial_capital,
+        transaction_fees=profile.transaction_fees,
+    )["stats"]
+    base_score = profile.base_score(
+        sharpe=stats["sharpe_ratio"],
+        cum_ret=stats["cumulative_return"],
+        mdd=stats["max_drawdown"],
+        initial_capital=initial_capital,
+    )["base_score"]
+    return {
+        "sharpe_ratio": stats["sharpe_ratio"],
+        "max_drawdown": stats["max_drawdown"],
+        "cumulative_return": stats["cumulative_return"],
+        "base_score": base_score,
+    }
+
+
+def summarize(values: np.ndarray) -> dict[str, float]:
+    """Mean, std and `PERCENTILES` of one metric over the paths."""
+    summary = {"mean": float(np.nanmean(values)), "std": float(np.nanstd(values))}
+    for q, v in zip(PERCENTILES, np.nanpercentile(values, PERCENTILES)):
+        summary[f"p{q}"] = float(v)
+    return summary
+
+
+def monte_carlo(
+    bot_path: str,
+    path_csv: str,
+    n_paths: int = 1_000,
+    block_size: int = 20,
+    seed: int = 0,
+    chunk_size: int = 32,
+    workers: int | None = None,
+    initial_capital: float = 1_000,
+) -> dict[str, Any]:
+    """
+    Score a bot on `n_paths` bootstrapped paths of a dataset.
+
+    Returns
+    -------
+    dict
+        Contains:
+        - "metrics": {metric: per-path values} for sharpe_ratio,
+          max_drawdown, cumulative_return and base_score
+        - "summary": {metric: `summarize` of its values}
+    """
+    prices = load_prices(path_csv)
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    with (
+        SharedPrices(prices) as shared,
+        ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            initializer=_init_worker,
+            initargs=(os.path.abspath(bot_path), shared.handle, block_size, initial_capital),
+        ) as executor,
+    ):
+        chunks = list(executor.map(evaluate_chunk, zip(sizes, seeds)))
+
+    metrics = {
+        name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]
+    }
+    return {
+        "metrics": metrics,
+        "summary": {name: summarize(values) for name, values in metrics.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("bot", help="bot module exposing make_decision")
+    parser.add_argument("csv", help="price CSV")
+    parser.add_argument("--paths", type=int, default=1_000)
+    parser.add_argument("--block", type=int, default=20, help="bootstrap block length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write per-path metrics and summary to this JSON file")
+    args = parser.parse_args()
+
+    report = monte_carlo(
+        args.bot, args.csv, n_paths=args.paths, block_size=args.block,
+        seed=args.seed, workers=args.workers,
+    )
+
+    print(f"{args.paths} paths, block {args.block}")
+    print(f"{'':18}" + "".join(f"{k:>9}" for k in ["mean", *(f"p{q}" for q in PERCENTILES)]))
+    for name, summary in report["summary"].items():
+        print(
+            f"{name:18}"
+            + "".join(f"{summary[k]:9.4f}" for k in ["mean", *(f"p{q}" for q in PERCENTILES)])
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "metrics": {k: v.tolist() for k, v in report["metrics"].items()},
+                    "summary": report["summary"],
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
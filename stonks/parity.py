@@ -0,0 +1,205 @@
+"""
+Parity checks of the fast paths against their reference implementation.
+
+The NumPy backtest engine (`backtest(engine="numpy")`) must give the pnl and
+stats of the reference per-row loop (`engine="pandas"`), including on
+prices with missing cells, which the loop's pandas sums treat as a lost
+position. Each phase's bundled CSV is checked as is and with gaps punched in
+its asset columns, under random weights and under weights concentrated on
+one asset. main.py's `local_score_arrays` is checked the same way against
+`get_local_score`, all stats and scores included, and the CSV readers
+(`load_price_arrays`, `stonks.streaming.iter_blocks`) against `pd.read_csv`
+on the same tables. Each phase's main.py must also start as
+`stonks.bench --startup-only` requires: under the startup budget, without
+importing pandas or matplotlib:
+
+    python -m stonks.parity
+    python -m stonks.parity --phases phase3 --epochs 2520 --gaps 10
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from stonks import engine
+from stonks.arrays import load_price_arrays, local_score_arrays
+from stonks.bench import STARTUP_BUDGET, measure_startup
+from stonks.phases import PHASES, REPO_ROOT, load_prices
+from stonks.profiles import PROFILES, Profile
+from stonks.streaming import iter_blocks
+
+RTOL = 1e-9
+ATOL = 1e-12
+
+
+def with_gaps(prices: pd.DataFrame, n_gaps: int, seed: int = 0) -> pd.DataFrame:
+    """Copy of `prices` with `n_gaps` asset cells (never Cash) set to NaN."""
+    rng = np.random.default_rng(seed)
+    values = prices.to_numpy(dtype=np.float64, copy=True)
+    assets = [i for i, c in enumerate(prices.columns) if c != "Cash"]
+    rows = rng.integers(0, len(prices), size=n_gaps)
+    cols = rng.choice(assets, size=n_gaps)
+    values[rows, cols] = np.nan
+    return pd.DataFrame(values, index=prices.index, columns=prices.columns)
+
+
+def sample_weights(prices: pd.DataFrame, seed: int = 0) -> dict[str, np.ndarray]:
+    """Weight matrices to backtest: random, and mostly on the first asset."""
+    rng = np.random.default_rng(seed)
+    n_epochs, n_columns = prices.shape
+    concentrated = np.full(n_columns, 0.01 / (n_columns - 1))
+    concentrated[0] = 0.99
+    return {
+        "random": rng.dirichlet(np.ones(n_columns), n_epochs),
+        "concentrated": np.tile(concentrated, (n_epochs, 1)),
+    }
+
+
+def compare_stats(stats: dict, reference: dict) -> list[str]:
+    """Names of the stats that differ from the reference, with both values."""
+    return [
+        f"{name}: {stats[name]!r} vs {value!r}"
+        for name, value in reference.items()
+        if not np.isclose(stats[name], value, rtol=RTOL, atol=ATOL, equal_nan=True)
+    ]
+
+
+def check_engines(prices: pd.DataFrame, weights: np.ndarray, profile: Profile) -> list[str]:
+    """Differences between the NumPy and the reference backtest engines."""
+    positions = pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+    results = {
+        name: engine.backtest(
+            prices,
+            positions,
+            initial_capital=1_000,
+            transaction_fees=profile.transaction_fees,
+            engine=name,
+        )
+        for name in ("pandas", "numpy")
+    }
+    reference, fast = results["pandas"], results["numpy"]
+    pnl, ref_pnl = fast["pnl"].to_numpy(float), reference["pnl"].to_numpy(float)
+    failures = []
+    if not np.allclose(pnl, ref_pnl, rtol=RTOL, atol=ATOL):
+        t = int(np.argmax(~np.isclose(pnl, ref_pnl, rtol=RTOL, atol=ATOL)))
+        failures.append(f"pnl at epoch {prices.index[t]}: {pnl[t]!r} vs {ref_pnl[t]!r}")
+    return failures + compare_stats(fast["stats"], reference["stats"])
+
+
+def check_local_score(prices: pd.DataFrame, weights: np.ndarray, profile: Profile) -> list[str]:
+    """Differences between main.py's `local_score_arrays` and `get_local_score`."""
+    positions = pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+    reference = engine.get_local_score(prices, positions, profile, initial_capital=1_000)
+    fast = local_score_arrays(
+        prices.index.to_numpy(), list(prices.columns), prices.to_numpy(dtype=np.float64),
+        weights, profile, initial_capital=1_000,
+    )
+    return compare_stats(fast["stats"], reference["stats"]) + compare_stats(
+        fast["scores"], reference["scores"]
+    )
+
+
+def check_loaders(table: pd.DataFrame) -> list[str]:
+    """
+    Differences between the CSV readers (main.py's `load_price_arrays` and
+    the blocks of `iter_blocks`) and `pd.read_csv` on `table` written as a
+    CSV, its NaN cells left empty.
+    pandas parses with `float_precision="round_trip"`: its default parser
+    can be one ulp off the exact value.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path_csv = os.path.join(tmp, "prices.csv")
+        table.to_csv(path_csv, float_format="%.17g")
+        reference = pd.read_csv(path_csv, index_col=0, float_precision="round_trip")
+        reference["Cash"] = 1.0
+        try:
+            epochs, columns, values = load_price_arrays(path_csv)
+            blocks = list(iter_blocks(path_csv, block_size=len(table) // 3 + 1, use_cache=False))
+        except ValueError as e:
+            return [f"{type(e).__name__}: {e}"]
+
+    failures = []
+    if columns != list(reference.columns):
+        failures.append(f"columns: {columns} vs {list(reference.columns)}")
+    for name, (e, v) in {
+        "load_price_arrays": (epochs, values),
+        "iter_blocks": (np.concatenate([b[0] for b in blocks]), np.vstack([b[1] for b in blocks])),
+    }.items():
+        if not np.array_equal(e, reference.index.to_numpy()):
+            failures.append(f"{name}: epochs differ")
+        elif not np.array_equal(v, reference.to_numpy(dtype=np.float64), equal_nan=True):
+            failures.append(f"{name}: prices differ")
+    return failures
+
+
+def check_startup(phase: str, budget: float) -> list[str]:
+    """
+    `stonks.bench`'s startup check of a phase: importing its main.py in a
+    fresh interpreter stays under `budget` seconds and loads none of
+    `HEAVY_MODULES`.
+    """
+    result = measure_startup(phase, repeat=3)
+    failures = []
+    if result["heavy_imports"]:
+        failures.append(f"main.py imports {', '.join(result['heavy_imports'])}")
+    if result["seconds"] > budget:
+        failures.append(f"main.py imported in {result['seconds'] * 1e3:.0f} ms, over {budget * 1e3:.0f} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--phases", nargs="+", default=list(PHASES))
+    parser.add_argument("--epochs", type=int, default=1_000, help="rows of each CSV used")
+    parser.add_argument("--gaps", type=int, default=5, help="NaN cells punched in the prices")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--startup-budget", type=float, default=STARTUP_BUDGET, help="seconds to import main.py"
+    )
+    args = parser.parse_args()
+
+    n_failed = 0
+    for phase in args.phases:
+        phase_dir = os.path.join(REPO_ROOT, phase)
+        path_csv = sorted(glob.glob(os.path.join(phase_dir, "data", "*.csv")))[0]
+        failures = check_startup(phase, args.startup_budget)
+        print(f"{phase}  {'startup':9} {'':6} {'':13} {'ok' if not failures else 'FAIL'}")
+        for f in failures:
+            print(f"    {f}")
+        n_failed += bool(failures)
+
+        prices = load_prices(path_csv).iloc[: args.epochs]
+        table = prices.drop(columns="Cash")
+        for label, t in (("clean", table), ("gaps", with_gaps(table, args.gaps, args.seed))):
+            failures = check_loaders(t)
+            print(f"{phase}  {'loader':9} {label:6} {'':13} {'ok' if not failures else 'FAIL'}")
+            for f in failures:
+                print(f"    {f}")
+            n_failed += bool(failures)
+        for label, p in (("clean", prices), ("gaps", with_gaps(prices, args.gaps, args.seed))):
+            for name, weights in sample_weights(p, args.seed).items():
+                with warnings.catch_warnings():
+                    # The reference loop works on object columns
+                    warnings.simplefilter("ignore", FutureWarning)
+                    checks = {
+                        "backtest": check_engines(p, weights, PROFILES[phase]),
+                        "local": check_local_score(p, weights, PROFILES[phase]),
+                    }
+                for check, failures in checks.items():
+                    status = "ok" if not failures else "FAIL"
+                    print(f"{phase}  {check:9} {label:6} {name:13} {status}")
+                    for f in failures:
+                        print(f"    {f}")
+                    n_failed += bool(failures)
+
+    sys.exit(1 if n_failed else 0)
+
+
+if __name__ == "__main__":
+    main()
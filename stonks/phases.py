@@ -0,0 +1,114 @@
+"""
+Loading a phase's prices, scoring profile and bots, and running a bot over
+a price table the same way the phases' main.py does.
+"""
+
+import importlib.util
+import itertools
+import os
+import sys
+from types import ModuleType
+
+import numpy as np
+import pandas as pd
+
+from stonks.bots import Bot
+from stonks.datasets import load_dataset
+from stonks.engine import backtest
+from stonks.profiles import Profile
+from stonks.runner import run_batch_decisions, run_fast_decisions
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("phase1", "phase2", "phase3")
+
+_load_counter = itertools.count()
+
+
+def load_prices(path_csv: str) -> pd.DataFrame:
+    """
+    Read a price CSV with the layout of `find_csv_file` in main.py, through
+    the dataset cache: the frame wraps the read-only memory-mapped prices.
+    """
+    epochs, columns, values = load_dataset(path_csv)
+    return pd.DataFrame(values, index=pd.Index(epochs), columns=columns, copy=False)
+
+
+def load_module(path: str) -> ModuleType:
+    """
+    Import the file at `path` as a new module object.
+
+    Every call returns a fresh module, so module-level state such as a bot's
+    `price_history` is never shared between two loads. The file's directory
+    is put on `sys.path` so that bots can import their sibling helpers.
+    """
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f"_stonks_{stem}_{next(_load_counter)}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_bot(make_decision, prices: pd.DataFrame) -> np.ndarray:
+    """
+    Call `make_decision(epoch, *asset_prices)` on every row of `prices`.
+
+    The loop and the checks are main.py's (`runner.run_fast_decisions`):
+    decisions are dicts or tuples / NumPy rows of weights in the column
+    order of `prices`, and an invalid one raises ValueError.
+
+    Returns
+    -------
+    np.ndarray
+        Weights of shape (T, n_columns), in the column order of `prices`.
+    """
+    return run_fast_decisions(make_decision, *_arrays(prices))
+
+
+def decide(bot: ModuleType | Bot, prices: pd.DataFrame) -> np.ndarray:
+    """
+    Weights of a bot module or `Bot` over `prices`, like `run_bot`, through
+    its vectorized `make_decisions(asset_prices) -> (T, n_columns)` when it
+    exports one (`runner.run_batch_decisions`) and its `make_decision` /
+    `on_tick` otherwise.
+    """
+    make_decisions = getattr(bot, "make_decisions", None)
+    if make_decisions is None:
+        return run_bot(bot.on_tick if isinstance(bot, Bot) else bot.make_decision, prices)
+    return run_batch_decisions(make_decisions, *_arrays(prices))
+
+
+def _arrays(prices: pd.DataFrame) -> tuple[np.ndarray, list[str], np.ndarray]:
+    return (
+        prices.index.to_numpy(),
+        list(prices.columns),
+        prices.to_numpy(dtype=np.float64),
+    )
+
+
+def score_weights(
+    profile: Profile,
+    prices: pd.DataFrame,
+    weights: np.ndarray,
+    initial_capital: float = 1_000,
+) -> dict[str, dict]:
+    """`get_local_score` under a phase's profile, without the pnl dict."""
+    positions = pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+    stats = backtest(
+        prices=prices,
+        positions=positions,
+        initial_capital=initial_capital,
+        transaction_fees=profile.transaction_fees,
+    )["stats"]
+    scores = profile.base_score(
+        sharpe=stats["sharpe_ratio"],
+        cum_ret=stats["cumulative_return"],
+        mdd=stats["max_drawdown"],
+        initial_capital=initial_capital,
+    )
+    return {"stats": stats, "scores": scores}
@@ -0,0 +1,107 @@
+"""
+Per-phase scoring parameters.
+
+The three phases share the backtest and the base score formula; they only
+differ by their transaction fees and by how the max drawdown is scored. A
+`Profile` holds those parameters, and `PROFILES` the ones of each phase, as
+set in the phases' original `scoring/scoring.py`; `profile_for` finds the
+profile of a bot or CSV from its phase directory.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    Fees and base score parameters of a phase.
+
+    Parameters
+    ----------
+    name : str
+        Phase name, e.g. "phase2".
+    transaction_fees : float
+        Proportional transaction cost applied to traded notional.
+    mdd_score : {"linear", "ratio"}
+        How the max drawdown is scored: `1 - mdd / mdd_bound` ("linear",
+        phases 2 and 3 with `mdd_bound = -1`) or `mdd_bound / mdd` ("ratio",
+        phase 1 with `mdd_bound = -0.01`).
+    mdd_bound : float
+        `mdd_min` or `mdd_max` of the original `get_base_score`.
+    sharpe_max, cum_ret_max : float
+        Sharpe ratio and cumulative return giving a full score.
+    sharpe_w, pnl_w, mdd_w : float
+        Weights of the three scores in the base score, summing to 1.
+    """
+
+    name: str
+    transaction_fees: float
+    mdd_score: str = "linear"
+    mdd_bound: float = -1.0
+    sharpe_max: float = 2.0
+    cum_ret_max: float = 5.0
+    sharpe_w: float = 0.3
+    pnl_w: float = 0.6
+    mdd_w: float = 0.1
+
+    def __post_init__(self):
+        if self.mdd_score not in ("linear", "ratio"):
+            raise ValueError(f"mdd_score must be 'linear' or 'ratio', got {self.mdd_score!r}")
+        total = self.sharpe_w + self.pnl_w + self.mdd_w
+        if not np.isclose(total, 1):
+            raise ValueError(f"[BASE SCORE] Sum of weights must be equal to 1, got {total}")
+
+    def base_score(
+        self, sharpe, cum_ret, mdd, initial_capital: float = 1000
+    ) -> dict[str, float | np.ndarray]:
+        """
+        `get_base_score` of the phase; the stats may be scalars or arrays
+        (one value per strategy or path).
+        """
+        pnl = initial_capital * np.asarray(cum_ret)
+        pnl_max = initial_capital * self.cum_ret_max
+
+        sharpe_score = np.maximum(sharpe, 0) / self.sharpe_max
+        pnl_score = np.maximum(pnl, 0) / pnl_max
+        with np.errstate(divide="ignore"):
+            if self.mdd_score == "linear":
+                mdd_score = 1 - np.asarray(mdd) / self.mdd_bound
+            else:
+                mdd_score = self.mdd_bound / np.asarray(mdd)
+
+        return {
+            "sharpe_score": sharpe_score,
+            "pnl_score": pnl_score,
+            "mdd_score": mdd_score,
+            "base_score": (
+                self.sharpe_w * sharpe_score + self.pnl_w * pnl_score + self.mdd_w * mdd_score
+            ),
+        }
+
+
+PROFILES = {
+    "phase1": Profile("phase1", transaction_fees=0.0005, mdd_score="ratio", mdd_bound=-0.01),
+    "phase2": Profile("phase2", transaction_fees=0.0001),
+    "phase3": Profile("phase3", transaction_fees=0.0001),
+}
+
+
+def find_phase_dir(path: str) -> str:
+    """Return the phase directory (the one holding `scoring/`) containing `path`."""
+    directory = os.path.abspath(path)
+    if not os.path.isdir(directory):
+        directory = os.path.dirname(directory)
+    while not os.path.isfile(os.path.join(directory, "scoring", "scoring.py")):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            raise FileNotFoundError(f"No phase directory above {path}")
+        directory = parent
+    return directory
+
+
+def profile_for(path: str) -> Profile:
+    """Scoring profile of the phase directory containing `path` (a bot or a CSV)."""
+    return PROFILES[os.path.basename(find_phase_dir(path))]
@@ -0,0 +1,349 @@
+"""
+Running a bot over a price CSV, for any phase and any number of assets.
+
+This is the decision loop and scoring of the phases' main.py, written once:
+asset columns are read from the CSV header, the bot is called as
+`make_decision(epoch, *asset_prices)` (or `make_decisions(asset_prices)` in
+one call when it exports it), and fees and base score come from the phase
+`Profile`. Each phase's main.py is a thin wrapper around `run`; the runner
+can also be called directly, on any bot and CSV:
+
+    python -m stonks.runner phase3/bot_trade.py phase3/data/asset_a_b_train.csv --live
+    python -m stonks.runner my_bot.py data.csv --profile phase2 --profile-latency=lat.csv
+
+Options are those of main.py: `--live`, `--stop-drawdown=<x>`,
+`--profile-latency[=<file.csv>]` and `--show-graph`. The profile defaults to
+the phase directory holding the bot.
+
+Prices and weights stay NumPy arrays from the CSV to the score
+(`stonks.arrays`): a run imports neither pandas nor, unless `--show-graph`
+is given, matplotlib, which keeps the start of every main.py process short.
+The CSV itself is parsed once, then memory-mapped from `stonks.datasets`.
+"""
+
+import argparse
+import time
+from types import ModuleType
+
+import numpy as np
+
+from stonks.arrays import IncrementalBacktest, local_score_arrays, show_result
+from stonks.bots import Bot, ModuleBot
+from stonks.datasets import load_dataset
+from stonks.profiles import PROFILES, Profile, profile_for
+
+# How often the PnL is printed with --live (one trading year)
+LIVE_REPORT_EVERY = 252
+# Number of epoch bins of the latency trend (--profile-latency)
+LATENCY_TREND_BINS = 10
+# Weight types accepted as numbers, matching the dtype kinds of NumPy rows
+NUMERIC_TYPES = (int, float, np.bool_, np.integer, np.floating)
+NUMERIC_KINDS = "biuf"
+
+
+def is_numeric(value) -> bool:
+    """
+    Whether a weight is a number: Python or NumPy bool, int or float, the
+    same rule as the dtype kinds (`NUMERIC_KINDS`) accepted for NumPy rows.
+    """
+    return isinstance(value, NUMERIC_TYPES)
+
+
+def validate_decision(decision: dict, columns: list[str]) -> bool:
+    """main.py's checks of one decision: keys, numeric non-NaN values in [0, 1], sum of 1."""
+    expected_keys = set(columns)
+    if set(decision.keys()) != expected_keys:
+        print(f"ERREUR: Les clés attendues sont {expected_keys}, mais reçu {set(decision.keys())}")
+        return False
+
+    for key, value in decision.items():
+        if not is_numeric(value):
+            print(f"ERREUR: La valeur pour '{key}' n'est pas numérique: {value}")
+            return False
+        if np.isnan(value):
+            print(f"ERREUR: Allocation manquante (NaN) pour '{key}'")
+            return False
+        if value < 0 or value > 1:
+            print(f"ERREUR: La valeur pour '{key}' doit être entre 0 et 1, reçu: {value}")
+            return False
+
+    total = sum(decision.values())
+    if abs(total - 1.0) > 0.00001:
+        print(f"ERREUR: La somme des allocations doit être égale à 1, mais vaut {total}")
+        return False
+
+    return True
+
+
+def decision_as_dict(decision, columns: list[str]) -> dict:
+    """
+    A decision as a {column: weight} dict; tuples, lists and NumPy rows are
+    weights in the column order of the CSV followed by Cash, e.g. (0.7, 0.3).
+    """
+    if isinstance(decision, dict):
+        return decision
+    if np.ndim(decision) != 1 or len(decision) != len(columns):
+        print(f"ERREUR: {len(columns)} allocations attendues dans l'ordre {columns}, mais reçu {decision}")
+        raise ValueError(f"Décision invalide: {decision}")
+    if isinstance(decision, np.ndarray):
+        decision = decision.tolist()
+    return dict(zip(columns, decision))
+
+
+def validate_weights(weights: np.ndarray, epochs: np.ndarray, columns: list[str]):
+    """`validate_decision` on every row at once; raises on the first invalid one."""
+    bad = (
+        np.isnan(weights).any(axis=1)
+        | ((weights < 0) | (weights > 1)).any(axis=1)
+        | (np.abs(weights.sum(axis=1) - 1.0) > 0.00001)
+    )
+    if bad.any():
+        t = int(np.argmax(bad))
+        decision = dict(zip(columns, weights[t].tolist()))
+        # Prints the reason, NaN included
+        validate_decision(decision, columns)
+        raise ValueError(f"Décision invalide à l'epoch {epochs[t]}: {decision}")
+
+
+def print_live(epoch: int, live: IncrementalBacktest):
+    line = f"[epoch {epoch}] PnL: {(live.pnl - 1) * 100:+.2f}%  Drawdown: {live.drawdown * 100:.2f}%"
+    if live.n_returns >= 2 and live.max_drawdown < 0:
+        line += f"  Base Score: {live.scores()['base_score']:.4f}"
+    print(line)
+
+
+def feed_live(
+    live: IncrementalBacktest,
+    epoch: int,
+    row: np.ndarray,
+    weights: list[float],
+    report_live: bool,
+    stop_drawdown: float | None,
+) -> bool:
+    """Update the incremental backtest; True when the run must stop."""
+    live.update(row, weights)
+    if report_live and live.n_epochs % LIVE_REPORT_EVERY == 0:
+        print_live(epoch, live)
+    if stop_drawdown is not None and live.drawdown < -stop_drawdown:
+        print_live(epoch, live)
+        print(f"\033[91mArrêt anticipé à l'epoch {epoch}: drawdown supérieur à {stop_drawdown * 100:.2f}%\033[0m")
+        return True
+    return False
+
+
+def asset_rows(columns: list[str], values: np.ndarray) -> list[list[float]]:
+    """Rows of asset prices (every column but Cash), as lists of floats."""
+    assets = [i for i, c in enumerate(columns) if c != "Cash"]
+    return values[:, assets].tolist()
+
+
+def run_decisions(
+    make_decision,
+    epochs: np.ndarray,
+    columns: list[str],
+    values: np.ndarray,
+    live: IncrementalBacktest | None = None,
+    report_live: bool = False,
+    stop_drawdown: float | None = None,
+    latency: np.ndarray | None = None,
+) -> np.ndarray | None:
+    """
+    Call the bot on every epoch, validating each decision as it comes, and
+    return the weights (None on an early stop). `latency` (T x 2), when
+    given, receives the duration of each bot call and of its validation.
+    """
+    weights = np.empty((len(epochs), len(columns)))
+
+    for t, (epoch, row) in enumerate(zip(epochs.tolist(), asset_rows(columns, values))):
+        if latency is not None:
+            start = time.perf_counter()
+        decision = make_decision(epoch, *row)
+        if latency is not None:
+            decided = time.perf_counter()
+        decision = decision_as_dict(decision, columns)
+        if not validate_decision(decision, columns):
+            raise ValueError(f"Décision invalide: {decision}")
+        if latency is not None:
+            latency[t] = decided - start, time.perf_counter() - decided
+        weights[t] = [decision[c] for c in columns]
+        if live is not None and feed_live(
+            live, epoch, values[t], weights[t], report_live, stop_drawdown
+        ):
+            return None
+    return weights
+
+
+def run_fast_decisions(
+    make_decision,
+    epochs: np.ndarray,
+    columns: list[str],
+    values: np.ndarray,
+    live: IncrementalBacktest | None = None,
+    report_live: bool = False,
+    stop_drawdown: float | None = None,
+) -> np.ndarray | None:
+    """
+    Same loop as `run_decisions`, with the weights written to a preallocated
+    array and validated at once at the end (except in live mode, where each
+    row is validated before use).
+    """
+    expected_keys = set(columns)
+    weights = np.empty((len(epochs), len(columns)))
+
+    for t, (epoch, row) in enumerate(zip(epochs.tolist(), asset_rows(columns, values))):
+        decision = make_decision(epoch, *row)
+        # Well-formed numeric decisions are stored as is; the range, NaN and
+        # sum checks run on the whole array at the end
+        if isinstance(decision, dict):
+            if decision.keys() != expected_keys or not all(map(is_numeric, decision.values())):
+                if not validate_decision(decision, columns):
+                    raise ValueError(f"Décision invalide à l'epoch {epoch}: {decision}")
+            weights[t] = [decision[c] for c in columns]
+        else:
+            # Compact form: weights in the column order
+            if isinstance(decision, np.ndarray):
+                numeric = decision.shape == (len(columns),) and decision.dtype.kind in NUMERIC_KINDS
+            elif isinstance(decision, (tuple, list)):
+                numeric = len(decision) == len(columns) and all(map(is_numeric, decision))
+            else:
+                numeric = False
+            # decision_as_dict raises on anything that is not one row of weights
+            if not numeric and not validate_decision(decision_as_dict(decision, columns), columns):
+                raise ValueError(f"Décision invalide à l'epoch {epoch}: {decision}")
+            weights[t] = decision
+        if live is not None:
+            if not validate_decision(decision_as_dict(decision, columns), columns):
+                raise ValueError(f"Décision invalide à l'epoch {epoch}: {decision}")
+            if feed_live(live, epoch, values[t], weights[t], report_live, stop_drawdown):
+                return None
+
+    validate_weights(weights, epochs, columns)
+    return weights
+
+
+def run_batch_decisions(
+    make_decisions,
+    epochs: np.ndarray,
+    columns: list[str],
+    values: np.ndarray,
+    live: IncrementalBacktest | None = None,
+    report_live: bool = False,
+    stop_drawdown: float | None = None,
+) -> np.ndarray | None:
+    """One `make_decisions` call for the whole series, then `validate_weights`."""
+    assets = [i for i, c in enumerate(columns) if c != "Cash"]
+    weights = np.asarray(make_decisions(values[:, assets]), dtype=float)
+    if weights.shape != (len(epochs), len(columns)):
+        raise ValueError(
+            f"make_decisions doit renvoyer un tableau de forme {(len(epochs), len(columns))}, reçu {weights.shape}"
+        )
+
+    validate_weights(weights, epochs, columns)
+
+    if live is not None:
+        for epoch, row, weight in zip(epochs.tolist(), values, weights):
+            if feed_live(live, epoch, row, weight, report_live, stop_drawdown):
+                return None
+    return weights
+
+
+def show_latency(latency: np.ndarray, epochs: np.ndarray, n_slowest: int = 5):
+    """Per-tick latency report: percentiles, trend over the epochs, slowest epochs."""
+    print("\n" + "=" * 70)
+    print("⏱️  LATENCE PAR TICK (µs)")
+    print("=" * 70)
+    for name, values in (("make_decision", latency[:, 0]), ("validate_decision", latency[:, 1])):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1e6
+        print(f"  {name:18} p50: {p50:9.1f}  p95: {p95:9.1f}  p99: {p99:9.1f}  max: {values.max() * 1e6:9.1f}")
+
+    decision_latency = latency[:, 0]
+    bins = np.array_split(np.arange(len(epochs)), min(LATENCY_TREND_BINS, len(epochs)))
+    print("\n  Tendance (make_decision, moyenne par tranche d'epochs):")
+    for b in bins:
+        print(f"    epochs {epochs[b[0]]:>8} - {epochs[b[-1]]:<8} {decision_latency[b].mean() * 1e6:9.1f}")
+    if len(epochs) > 1:
+        slope = np.polyfit(epochs.astype(float), decision_latency, 1)[0]
+        print(f"  Pente: {slope * 1e6 * 1000:+.3f} µs par 1000 epochs")
+
+    print(f"\n  {n_slowest} epochs les plus lents (make_decision):")
+    for t in np.argsort(decision_latency)[::-1][:n_slowest]:
+        print(f"    epoch {epochs[t]:>8}: {decision_latency[t] * 1e6:9.1f}")
+
+
+def run(bot: ModuleType | Bot, path_csv: str, options: list[str], profile: Profile):
+    """
+    main.py: run `bot` (a `make_decision` module or a `Bot`) over the CSV,
+    then print (and with `--show-graph`, plot) its local score under `profile`.
+    """
+    epochs, columns, values = load_dataset(path_csv)
+
+    # --live: PnL and score as the run goes
+    # --stop-drawdown=<x>: early stop once the drawdown exceeds x (e.g. 0.3)
+    # --profile-latency[=<file.csv>]: latency of every bot call (and CSV export)
+    stop_drawdown = None
+    latency = None
+    latency_csv = None
+    for option in options:
+        if option.startswith("--stop-drawdown="):
+            stop_drawdown = float(option.split("=", 1)[1])
+        if option.startswith("--profile-latency"):
+            latency = np.zeros((len(epochs), 2))
+            if "=" in option:
+                latency_csv = option.split("=", 1)[1]
+    live = None
+    if "--live" in options or stop_drawdown is not None:
+        live = IncrementalBacktest(profile, initial_capital=1_000)
+
+    # Latency profiling times make_decision and validate_decision tick by
+    # tick: it keeps the original loop
+    make_decisions = getattr(bot, "make_decisions", None)
+    make_decision = bot.on_tick if isinstance(bot, Bot) else bot.make_decision
+    run_options = {"live": live, "report_live": "--live" in options, "stop_drawdown": stop_drawdown}
+    if make_decisions is not None and latency is None:
+        weights = run_batch_decisions(make_decisions, epochs, columns, values, **run_options)
+    elif latency is None:
+        weights = run_fast_decisions(make_decision, epochs, columns, values, **run_options)
+    else:
+        weights = run_decisions(
+            make_decision, epochs, columns, values, latency=latency, **run_options
+        )
+    if latency is not None:
+        n_done = len(weights) if weights is not None else live.n_epochs
+        show_latency(latency[:n_done], epochs[:n_done])
+        if latency_csv is not None:
+            np.savetxt(
+                latency_csv,
+                np.column_stack([epochs[:n_done], latency[:n_done]]),
+                fmt=["%d", "%.9g", "%.9g"],
+                delimiter=",",
+                header="epoch,make_decision_s,validate_decision_s",
+                comments="",
+            )
+    if weights is None:
+        return
+    local_score = local_score_arrays(epochs, columns, values, weights, profile)
+    if "--show-graph" in options:
+        show_result(local_score, is_show_graph=True)
+    else:
+        show_result(local_score, is_show_graph=False)
+        print("\033[91mpour afficher le graphique, utilisez la commande --show-graph: ./main.py <path_to_csv> --show-graph\033[0m")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[1],
+        epilog="other options are passed to the run as in main.py",
+    )
+    parser.add_argument("bot", help="bot module exposing make_decision")
+    parser.add_argument("csv", help="price CSV")
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES), help="scoring profile (default: the bot's phase)"
+    )
+    args, options = parser.parse_known_args()
+
+    profile = PROFILES[args.profile] if args.profile else profile_for(args.bot)
+    run(ModuleBot(args.bot), args.csv, options, profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Price tables published once in shared memory for process pools.
+
+The parent process copies the price matrix (and its epoch index) into a
+`multiprocessing.shared_memory` block; workers attach to it with the small
+picklable `SharedPricesHandle` and get read-only NumPy views of the same
+pages, so memory stays flat as the number of workers grows.
+
+    with SharedPrices(load_prices(path_csv)) as shared:
+        ProcessPoolExecutor(initializer=init, initargs=(shared.handle,))
+        ...
+    # in the worker
+    prices = attach_prices(handle)
+"""
+
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Blocks attached in this process, kept open for as long as their views live
+_attached: dict[str, shared_memory.SharedMemory] = {}
+
+
+@dataclass(frozen=True)
+class SharedPricesHandle:
+    """What a worker needs to attach to a published price table."""
+
+    name: str
+    n_epochs: int
+    columns: tuple[str, ...]
+
+
+def _views(
+    buf: memoryview, n_epochs: int, n_columns: int
+) -> tuple[np.ndarray, np.ndarray]:
+    values = np.ndarray((n_epochs, n_columns), dtype=np.float64, buffer=buf)
+    epochs = np.ndarray(
+        (n_epochs,), dtype=np.int64, buffer=buf, offset=values.nbytes
+    )
+    return values, epochs
+
+
+class SharedPrices:
+    """
+    Owner of a price table published in shared memory.
+
+    The block is released by `close` (or on leaving the `with` block); it
+    must outlive the workers that attached to it.
+    """
+
+    def __init__(self, prices: pd.DataFrame):
+        n_epochs, n_columns = prices.shape
+        size = max(1, n_epochs * (n_columns + 1) * 8)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        values, epochs = _views(self._shm.buf, n_epochs, n_columns)
+        values[:] = prices.to_numpy(dtype=np.float64)
+        epochs[:] = prices.index.to_numpy(dtype=np.int64)
+        del values, epochs
+
+        self.handle = SharedPricesHandle(
+            name=self._shm.name,
+            n_epochs=n_epochs,
+            columns=tuple(str(c) for c in prices.columns),
+        )
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedPrices":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_values(handle: SharedPricesHandle) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Attach to a published table and return read-only `(values, epochs)` views.
+
+    `values` has shape (n_epochs, len(handle.columns)) in the column order of
+    the original DataFrame.
+    """
+    shm = _attached.get(handle.name)
+    if shm is None:
+        # The owner unlinks the block: keep the attaching process's resource
+        # tracker from unlinking it too (`track` is only there from 3.13).
+        try:
+            shm = shared_memory.SharedMemory(name=handle.name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=handle.name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        _attached[handle.name] = shm
+
+    values, epochs = _views(shm.buf, handle.n_epochs, len(handle.columns))
+    values.flags.writeable = False
+    epochs.flags.writeable = False
+    return values, epochs
+
+
+def attach_prices(handle: SharedPricesHandle) -> pd.DataFrame:
+    """Zero-copy, read-only DataFrame over a published price table."""
+    values, epochs = attach_values(handle)
+    return pd.DataFrame(
+        values, index=pd.Index(epochs), columns=list(handle.columns), copy=False
+    )
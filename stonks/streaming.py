@@ -0,0 +1,187 @@
+"""
+Running a bot over price files larger than memory.
+
+main.py loads the whole series before the first decision. For multi-GB
+datasets, `iter_blocks` reads the prices in blocks of `block_size` epochs
+instead, from the dataset cache's binary file when it holds the CSV
+(`stonks.datasets`) and from the CSV text otherwise. `stream_run` feeds each
+block to `make_decision` (the fast loop of `stonks.runner`), backtests it
+with `IncrementalBacktest.update_block`, appends its positions to a CSV
+and drops it, so the peak memory depends on the block size and not on the
+length of the series, as long as the bot itself keeps a bounded history
+(see `stonks.history.RingBuffer`):
+
+    python -m stonks.streaming phase3/bot_trade.py ticks.csv --positions positions.csv
+    python -m stonks.streaming my_bot.py ticks.csv --positions positions.csv --profile phase2 \\
+        --block 100000 --stop-drawdown 0.3
+
+Bots with a vectorized `make_decisions` are run tick by tick through their
+`make_decision`: a block alone lacks the history a batch call relies on.
+"""
+
+import argparse
+import csv
+import itertools
+import math
+import os
+from typing import IO, Iterator
+
+import numpy as np
+
+from stonks.arrays import IncrementalBacktest, _price_rows, show_result
+from stonks.bots import Bot, ModuleBot
+from stonks.datasets import DatasetCache
+from stonks.profiles import PROFILES, Profile, profile_for
+from stonks.runner import feed_live, run_fast_decisions
+
+DEFAULT_BLOCK = 65_536
+
+
+def csv_columns(path_csv: str) -> list[str]:
+    """Columns of a price CSV as loaded by main.py: its assets, then Cash."""
+    with open(path_csv, newline="") as f:
+        return [*next(csv.reader(f))[1:], "Cash"]
+
+
+def _open_npy(path: str) -> tuple[IO[bytes], tuple[int, ...], np.dtype]:
+    """
+    Open an `.npy` file, positioned after its header. Raises OSError,
+    ValueError or KeyError (unknown format version) on a file that cannot
+    be read in full.
+    """
+    f = open(path, "rb")
+    try:
+        read_header = {
+            (1, 0): np.lib.format.read_array_header_1_0,
+            (2, 0): np.lib.format.read_array_header_2_0,
+        }[np.lib.format.read_magic(f)]
+        shape, fortran_order, dtype = read_header(f)
+        if fortran_order:
+            raise ValueError(f"{path} is not stored in C order")
+        if os.fstat(f.fileno()).st_size - f.tell() < math.prod(shape) * dtype.itemsize:
+            raise ValueError(f"{path} is truncated")
+    except Exception:
+        f.close()
+        raise
+    return f, shape, dtype
+
+
+def iter_blocks(
+    path_csv: str, block_size: int = DEFAULT_BLOCK, use_cache: bool = True
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Prices of a CSV by blocks of at most `block_size` epochs.
+
+    Yields
+    ------
+    epochs : np.ndarray
+        Epochs of the block, as int64.
+    values : np.ndarray
+        Float64 prices of shape (n, n_columns) in the column order of
+        `csv_columns`, Cash being 1.
+    """
+    if not os.path.exists(path_csv):
+        raise FileNotFoundError(f"Le fichier CSV {path_csv} n'existe pas")
+
+    cache = DatasetCache()
+    if use_cache and cache.entry(path_csv) is not None:
+        paths = cache.paths(path_csv)
+        files = []
+        try:
+            values_file, shape, dtype = _open_npy(paths["values"])
+            files.append(values_file)
+            epochs_file, epochs_shape, epochs_dtype = _open_npy(paths["epochs"])
+            files.append(epochs_file)
+            n_epochs, width = shape
+            if epochs_shape != (n_epochs,):
+                raise ValueError(f"{paths['epochs']} does not match {paths['values']}")
+        except (OSError, ValueError, KeyError):
+            # Missing or damaged cache files: read the CSV, as DatasetCache.load
+            for f in files:
+                f.close()
+        else:
+            with values_file, epochs_file:
+                for start in range(0, n_epochs, block_size):
+                    n = min(block_size, n_epochs - start)
+                    epochs = np.fromfile(epochs_file, dtype=epochs_dtype, count=n)
+                    values = np.fromfile(values_file, dtype=dtype, count=n * width)
+                    yield epochs, values.reshape(n, width)
+            return
+
+    with open(path_csv, newline="") as f:
+        header = next(csv.reader(f))
+        while lines := list(itertools.islice(f, block_size)):
+            yield _price_rows(lines, len(header))
+
+
+def stream_run(
+    bot: Bot,
+    path_csv: str,
+    path_positions: str,
+    profile: Profile,
+    block_size: int = DEFAULT_BLOCK,
+    report_live: bool = False,
+    stop_drawdown: float | None = None,
+) -> IncrementalBacktest:
+    """
+    Run `bot` over a CSV block by block, writing its positions to
+    `path_positions` (one `epoch,<columns>` row per epoch) as it goes.
+
+    Returns
+    -------
+    IncrementalBacktest
+        The backtest of the epochs run, stopped early if the drawdown went
+        past `stop_drawdown`.
+    """
+    columns = csv_columns(path_csv)
+    live = IncrementalBacktest(profile, initial_capital=1_000)
+    # Per-epoch reporting and the early stop need the backtest row by row
+    per_epoch = report_live or stop_drawdown is not None
+
+    with open(path_positions, "w") as out:
+        out.write(",".join(["epoch", *columns]) + "\n")
+        for epochs, values in iter_blocks(path_csv, block_size):
+            weights = run_fast_decisions(bot.on_tick, epochs, columns, values)
+            n_done = len(epochs)
+            if per_epoch:
+                for t, epoch in enumerate(epochs.tolist()):
+                    if feed_live(live, epoch, values[t], weights[t], report_live, stop_drawdown):
+                        n_done = t + 1
+                        break
+            else:
+                live.update_block(values, weights)
+            np.savetxt(
+                out,
+                np.column_stack([epochs[:n_done], weights[:n_done]]),
+                fmt=["%d", *["%.17g"] * len(columns)],
+                delimiter=",",
+            )
+            if n_done < len(epochs):
+                break
+    return live
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("bot", help="bot module exposing make_decision")
+    parser.add_argument("csv", help="price CSV")
+    parser.add_argument("--positions", required=True, help="CSV the positions are written to")
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES), help="scoring profile (default: the bot's phase)"
+    )
+    parser.add_argument("--block", type=int, default=DEFAULT_BLOCK, help="epochs per block")
+    parser.add_argument("--live", action="store_true", help="print the PnL as the run goes")
+    parser.add_argument("--stop-drawdown", type=float, default=None)
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile] if args.profile else profile_for(args.bot)
+    live = stream_run(
+        ModuleBot(args.bot), args.csv, args.positions, profile, args.block,
+        args.live, args.stop_drawdown,
+    )
+    print(f"{live.n_epochs} epochs, positions written to {args.positions}")
+    show_result({"scores": live.scores(), "stats": live.stats()})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Parallel parameter sweep over a bot's `PARAMS`.
+
+A sweepable bot reads its thresholds and allocations from a module-level
+`PARAMS` dict (see phase2/bot_trade_v13_ladder.py). Every point of the grid
+is run on a fresh `ModuleBot` (the bot file is compiled once per worker) in
+a process pool, then ranked by base score. The indicator series a bot
+declares in `INDICATORS` come from the on-disk `IndicatorCache`, keyed by
+the hash of the prices, so they are computed once for all the points and
+all later sweeps over the same dataset:
+
+    python -m stonks.sweep phase2/bot_trade_v13_ladder.py phase2/data/asset_b_train.csv \\
+        --param strong_momentum=0.018,0.022,0.026 --param strong_allocation=0.99,0.995,1.0
+"""
+
+import argparse
+import ast
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from stonks.bots import ModuleBot
+from stonks.cache import IndicatorCache, dataset_hash
+from stonks.phases import decide, load_prices, score_weights
+from stonks.profiles import profile_for
+from stonks.shared_prices import SharedPrices, SharedPricesHandle, attach_prices
+
+# Per-worker state, set once by `_init_worker`
+_worker: dict[str, Any] = {}
+
+
+def expand_grid(grid: dict[str, list]) -> list[dict[str, Any]]:
+    """Cartesian product of a {name: [values]} grid, as a list of points."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def _init_worker(
+    bot_path: str, prices_handle: SharedPricesHandle, initial_capital: float
+):
+    _worker["bot_path"] = bot_path
+    _worker["prices"] = prices = attach_prices(prices_handle)
+    _worker["cache"] = IndicatorCache()
+    _worker["datasets"] = {c: dataset_hash(prices[c].to_numpy()) for c in prices.columns}
+    _worker["profile"] = profile_for(bot_path)
+    _worker["initial_capital"] = initial_capital
+
+
+def evaluate_point(params: dict[str, Any]) -> dict[str, Any]:
+    """Run the worker's bot with `params` merged into its `PARAMS` and score it."""
+    bot = ModuleBot(_worker["bot_path"], params)
+    prices = _worker["prices"]
+    indicators = getattr(bot.module, "INDICATORS", None)
+    if indicators:
+        bot.provide_series(
+            _worker["cache"].declared(indicators, prices, _worker["datasets"])
+        )
+    try:
+        weights = decide(bot, prices)
+    except ValueError as e:
+        return {"params": params, "base_score": -np.inf, "error": str(e)}
+
+    result = score_weights(
+        _worker["profile"], prices, weights, initial_capital=_worker["initial_capital"]
+    )
+    stats, scores = result["stats"], result["scores"]
+    return {
+        "params": params,
+        "base_score": float(scores["base_score"]),
+        "sharpe_ratio": float(stats["sharpe_ratio"]),
+        "cumulative_return": float(stats["cumulative_return"]),
+        "max_drawdown": float(stats["max_drawdown"]),
+    }
+
+
+def sweep(
+    bot_path: str,
+    path_csv: str,
+    grid: dict[str, list],
+    workers: int | None = None,
+    initial_capital: float = 1_000,
+) -> list[dict[str, Any]]:
+    """
+    Evaluate every point of `grid` and return the results ranked by base score.
+
+    Parameters
+    ----------
+    bot_path : str
+        Path to a bot module exposing `PARAMS` and `make_decision`.
+    path_csv : str
+        Price CSV to run the bot on.
+    grid : dict
+        {param name: list of values}; names must exist in the bot's `PARAMS`.
+    workers : int, optional
+        Number of worker processes (defaults to the number of CPUs).
+    initial_capital : float
+        Starting capital passed to the backtest and the base score.
+    """
+    defaults = ModuleBot(bot_path).params
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {bot_path}: {sorted(unknown)}")
+
+    points = expand_grid(grid)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(points) // (workers * 4))
+    with (
+        SharedPrices(load_prices(path_csv)) as shared,
+        ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(os.path.abspath(bot_path), shared.handle, initial_capital),
+        ) as executor,
+    ):
+        results = list(executor.map(evaluate_point, points, chunksize=chunksize))
+
+    return sorted(results, key=lambda r: r["base_score"], reverse=True)
+
+
+def parse_param(text: str) -> tuple[str, list]:
+    """Parse `name=v1,v2,...`; values are Python literals (numbers, tuples...)."""
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected name=v1,v2,..., got {text!r}")
+    parsed = ast.literal_eval(f"[{values}]")
+    return name.strip(), parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("bot", help="bot module exposing PARAMS")
+    parser.add_argument("csv", help="price CSV")
+    parser.add_argument(
+        "--param", action="append", type=parse_param, default=[],
+        help="name=v1,v2,... (repeatable)",
+    )
+    parser.add_argument("--grid", help="JSON file {name: [values]}")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument("--output", help="write all ranked results to this JSON file")
+    args = parser.parse_args()
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+    grid.update(dict(args.param))
+    if not grid:
+        parser.error("no parameter to sweep, use --param or --grid")
+
+    results = sweep(args.bot, args.csv, grid, workers=args.workers)
+
+    print(f"{len(results)} configurations, best first:")
+    for rank, r in enumerate(results[: args.top], start=1):
+        if "error" in r:
+            print(f"{rank:4d}  {'invalid':>10}  {r['params']}  {r['error']}")
+            continue
+        print(
+            f"{rank:4d}  base={r['base_score']:.4f}  sharpe={r['sharpe_ratio']:.3f}"
+            f"  ret={r['cumulative_return'] * 100:.1f}%  mdd={r['max_drawdown'] * 100:.2f}%"
+            f"  {r['params']}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
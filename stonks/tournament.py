@@ -0,0 +1,145 @@
+"""
+Tournament of every bot of a phase on the same prices.
+
+Finds every `bot_trade*.py` of a phase directory, runs each one in its own
+worker process (a process never runs two bots, so module-level state and
+anything a bot changes in its interpreter stay isolated), scores them with
+`get_local_score` under the phase's profile and prints a ranking by base
+score, with each bot's decision runtime:
+
+    python -m stonks.tournament phase2
+    python -m stonks.tournament phase2 --csv my_prices.csv --bots 'bot_trade_v1*' --workers 8
+"""
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from stonks.engine import get_local_score
+from stonks.phases import decide, load_module, load_prices
+from stonks.profiles import find_phase_dir, profile_for
+from stonks.shared_prices import SharedPrices, SharedPricesHandle, attach_prices
+
+# Per-worker state, set once by `_init_worker`
+_worker: dict[str, Any] = {}
+
+
+def find_bots(phase_dir: str, pattern: str = "bot_trade*.py") -> list[str]:
+    """Bot files of a phase directory matching `pattern`, sorted by name."""
+    return sorted(
+        path for path in glob.glob(os.path.join(phase_dir, "bot_trade*.py"))
+        if fnmatch.fnmatch(os.path.basename(path), pattern)
+    )
+
+
+def _init_worker(prices_handle: SharedPricesHandle, initial_capital: float):
+    _worker["prices"] = attach_prices(prices_handle)
+    _worker["initial_capital"] = initial_capital
+
+
+def evaluate_bot(bot_path: str) -> dict[str, Any]:
+    """Run one bot over the worker's prices and score it."""
+    prices = _worker["prices"]
+    result = {"bot": os.path.basename(bot_path)}
+    start = time.perf_counter()
+    try:
+        weights = decide(load_module(bot_path), prices)
+        result["runtime"] = time.perf_counter() - start
+        # Positions that do not fit the prices fail here, not in decide
+        positions = pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+        local_score = get_local_score(
+            prices, positions, profile_for(bot_path), initial_capital=_worker["initial_capital"]
+        )
+    except Exception as e:
+        return {**result, "base_score": -np.inf, "error": f"{type(e).__name__}: {e}"}
+    stats, scores = local_score["stats"], local_score["scores"]
+    return {
+        **result,
+        "base_score": float(scores["base_score"]),
+        "sharpe_ratio": float(stats["sharpe_ratio"]),
+        "cumulative_return": float(stats["cumulative_return"]),
+        "max_drawdown": float(stats["max_drawdown"]),
+    }
+
+
+def tournament(
+    bots: list[str],
+    path_csv: str,
+    workers: int | None = None,
+    initial_capital: float = 1_000,
+) -> list[dict[str, Any]]:
+    """
+    Evaluate every bot and return the results ranked by base score.
+
+    Parameters
+    ----------
+    bots : list of str
+        Paths to bot modules exposing `make_decision` (or `make_decisions`).
+    path_csv : str
+        Price CSV every bot runs on.
+    workers : int, optional
+        Number of worker processes (defaults to the number of CPUs).
+    initial_capital : float
+        Starting capital passed to `get_local_score`.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(bots))
+    with (
+        SharedPrices(load_prices(path_csv)) as shared,
+        ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shared.handle, initial_capital),
+            # One bot per process
+            max_tasks_per_child=1,
+        ) as executor,
+    ):
+        results = list(executor.map(evaluate_bot, [os.path.abspath(b) for b in bots]))
+
+    return sorted(results, key=lambda r: r["base_score"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("phase", help="phase directory, e.g. phase2")
+    parser.add_argument("--csv", help="price CSV (default: the first CSV of the phase's data/)")
+    parser.add_argument("--bots", default="bot_trade*.py", help="glob on bot file names")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write the ranked results to this JSON file")
+    args = parser.parse_args()
+
+    phase_dir = find_phase_dir(args.phase)
+    bots = find_bots(phase_dir, args.bots)
+    if not bots:
+        parser.error(f"no bot matching {args.bots!r} in {phase_dir}")
+    path_csv = args.csv or sorted(glob.glob(os.path.join(phase_dir, "data", "*.csv")))[0]
+
+    start = time.perf_counter()
+    results = tournament(bots, path_csv, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(results)} bots on {path_csv} ({elapsed:.1f}s), best first:")
+    print(f"{'':4}  {'bot':36} {'base':>8} {'sharpe':>8} {'mdd':>8} {'runtime':>9}")
+    for rank, r in enumerate(results, start=1):
+        if "error" in r:
+            print(f"{rank:4d}  {r['bot']:36} {'invalid':>8}  {r['error']}")
+            continue
+        print(
+            f"{rank:4d}  {r['bot']:36} {r['base_score']:8.4f} {r['sharpe_ratio']:8.3f}"
+            f" {r['max_drawdown'] * 100:7.2f}% {r['runtime']:8.3f}s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Walk-forward evaluation of a bot over rolling train/test windows.
+
+Each fold runs a freshly reset copy of the bot (a `ModuleBot`, in a worker
+process) from the start of its train window to the end of its test window.
+The train window doubles as the bot's warm-up history; both windows are
+scored separately, so the gap between in-sample and out-of-sample scores
+shows how much a hand-tuned version overfits:
+
+    python -m stonks.walkforward phase2/bot_trade_v12_fine_tuned.py phase2/data/asset_b_train.csv \\
+        --train 504 --test 252
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from stonks.bots import ModuleBot
+from stonks.phases import decide, load_prices, score_weights
+from stonks.profiles import profile_for
+from stonks.shared_prices import SharedPrices, SharedPricesHandle, attach_prices
+
+# Per-worker state, set once by `_init_worker`
+_worker: dict[str, Any] = {}
+
+
+def make_folds(
+    n_epochs: int,
+    train_size: int,
+    test_size: int,
+    step: int | None = None,
+    anchored: bool = False,
+) -> list[tuple[int, int, int]]:
+    """
+    Split `range(n_epochs)` into walk-forward folds.
+
+    Parameters
+    ----------
+    n_epochs : int
+        Length of the price series.
+    train_size : int
+        Epochs in each train window (the first one when `anchored`).
+    test_size : int
+        Epochs in each test window, at least 3 so that it can be scored.
+    step : int, optional
+        Shift between consecutive folds, `test_size` by default.
+    anchored : bool
+        Keep every train window starting at epoch 0 (expanding window)
+        instead of rolling it forward.
+
+    Returns
+    -------
+    list of (train_start, test_start, test_end)
+        Positional bounds; the train window is `[train_start, test_start)`
+        and the test window `[test_start, test_end)`.
+    """
+    if train_size < 3 or test_size < 3:
+        raise ValueError("Train and test windows need at least 3 epochs")
+    if step is None:
+        step = test_size
+    elif step < 1:
+        raise ValueError(f"The step between folds must be at least 1 epoch, got {step}")
+
+    folds = []
+    test_start = train_size
+    while test_start + test_size <= n_epochs:
+        train_start = 0 if anchored else test_start - train_size
+        folds.append((train_start, test_start, test_start + test_size))
+        test_start += step
+    if not folds:
+        raise ValueError(
+            f"No fold fits in {n_epochs} epochs with train={train_size} and test={test_size}"
+        )
+    return folds
+
+
+def _init_worker(
+    bot_path: str, prices_handle: SharedPricesHandle, initial_capital: float
+):
+    _worker["bot"] = ModuleBot(bot_path)
+    _worker["prices"] = attach_prices(prices_handle)
+    _worker["profile"] = profile_for(bot_path)
+    _worker["initial_capital"] = initial_capital
+
+
+def _score_window(prices: pd.DataFrame, weights: np.ndarray) -> dict[str, Any]:
+    result = score_weights(
+        _worker["profile"], prices, weights, initial_capital=_worker["initial_capital"]
+    )
+    return {
+        "stats": {k: float(v) for k, v in result["stats"].items()},
+        "base_score": float(result["scores"]["base_score"]),
+    }
+
+
+def evaluate_fold(fold: tuple[int, int, int]) -> dict[str, Any]:
+    """Run a fresh bot over one fold and score its train and test windows."""
+    train_start, test_start, test_end = fold
+    prices = _worker["prices"].iloc[train_start:test_end]
+    bot = _worker["bot"]
+    bot.reset()
+    weights = decide(bot, prices)
+
+    split = test_start - train_start
+    epochs = prices.index
+    return {
+        "train": [int(epochs[0]), int(epochs[split - 1])],
+        "test": [int(epochs[split]), int(epochs[-1])],
+        "train_score": _score_window(prices.iloc[:split], weights[:split]),
+        "test_score": _score_window(prices.iloc[split:], weights[split:]),
+    }
+
+
+def aggregate(folds: list[dict[str, Any]], window: str = "test_score") -> dict[str, Any]:
+    """Mean of every stat and mean/std/min of the base score over the folds."""
+    stats = pd.DataFrame([f[window]["stats"] for f in folds])
+    base_scores = np.array([f[window]["base_score"] for f in folds])
+    return {
+        "stats": stats.mean().to_dict(),
+        "base_score_mean": float(base_scores.mean()),
+        "base_score_std": float(base_scores.std(ddof=1)) if len(folds) > 1 else 0.0,
+        "base_score_min": float(base_scores.min()),
+    }
+
+
+def walk_forward(
+    bot_path: str,
+    path_csv: str,
+    train_size: int,
+    test_size: int,
+    step: int | None = None,
+    anchored: bool = False,
+    workers: int | None = None,
+    initial_capital: float = 1_000,
+) -> dict[str, Any]:
+    """
+    Run every fold of `make_folds` in a process pool.
+
+    Returns
+    -------
+    dict
+        Contains:
+        - "folds": per-fold bounds, train and test stats / base score
+        - "train", "test": `aggregate` of the train and test windows
+    """
+    prices = load_prices(path_csv)
+    folds = make_folds(len(prices), train_size, test_size, step, anchored)
+    with (
+        SharedPrices(prices) as shared,
+        ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            initializer=_init_worker,
+            initargs=(os.path.abspath(bot_path), shared.handle, initial_capital),
+        ) as executor,
+    ):
+        results = list(executor.map(evaluate_fold, folds))
+
+    return {
+        "folds": results,
+        "train": aggregate(results, "train_score"),
+        "test": aggregate(results, "test_score"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("bot", help="bot module exposing make_decision")
+    parser.add_argument("csv", help="price CSV")
+    parser.add_argument("--train", type=int, default=504, help="train window (epochs)")
+    parser.add_argument("--test", type=int, default=252, help="test window (epochs)")
+    parser.add_argument("--step", type=int, default=None, help="shift between folds")
+    parser.add_argument("--anchored", action="store_true", help="expanding train window")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write the full report to this JSON file")
+    args = parser.parse_args()
+
+    report = walk_forward(
+        args.bot, args.csv, args.train, args.test,
+        step=args.step, anchored=args.anchored, workers=args.workers,
+    )
+
+    print(f"{'fold':>4}  {'test epochs':>13}  {'train':>7}  {'test':>7}  {'sharpe':>7}  {'mdd':>8}")
+    for i, fold in enumerate(report["folds"]):
+        test = fold["test_score"]
+        print(
+            f"{i:4d}  {fold['test'][0]:6d}-{fold['test'][1]:<6d}"
+            f"  {fold['train_score']['base_score']:7.4f}  {test['base_score']:7.4f}"
+            f"  {test['stats']['sharpe_ratio']:7.3f}  {test['stats']['max_drawdown'] * 100:7.2f}%"
+        )
+    train, test = report["train"], report["test"]
+    print(
+        f"base score  train {train['base_score_mean']:.4f}"
+        f"  test {test['base_score_mean']:.4f} ± {test['base_score_std']:.4f}"
+        f" (min {test['base_score_min']:.4f})"
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()